@@ -13,8 +13,10 @@ from miio import DeviceException, ViomiVacuum
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_TOKEN, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     CONF_COMMAND_COOLDOWN,
@@ -23,12 +25,46 @@ from .const import (
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
 )
+from .batcher import WriteBatcher
+from .battery import BatteryEstimator
+from .calibration import CalibrationManager
 from .coordinator import ViomiSECoordinator
+from .planner import RoomJobPlanner
+from .schedule import ScheduleManager, async_reconcile_schedules
+from .statistics import CleaningStatistics
+from .walls import VirtualWallCache
 
 # Define the platforms that this integration will set up.
-PLATFORMS: list[Platform] = [Platform.VACUUM, Platform.SENSOR]
+PLATFORMS: list[Platform] = [
+    Platform.VACUUM,
+    Platform.SENSOR,
+    Platform.SELECT,
+    Platform.SWITCH,
+    Platform.NUMBER,
+]
 _LOGGER = logging.getLogger(__name__)
 
+# The integration is set up from config entries only.
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_RECONCILE_SCHEDULES = "reconcile_schedules"
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services that act on every vacuum at once."""
+
+    async def handle_reconcile_schedules(call: ServiceCall) -> ServiceResponse:
+        """Apply the schedule file to all vacuums."""
+        return await async_reconcile_schedules(hass)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECONCILE_SCHEDULES,
+        handle_reconcile_schedules,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """
@@ -36,7 +72,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     This function is called by Home Assistant when the integration is added.
     It sets up the connection, creates the data coordinator, and forwards
-    the setup to the platform files (vacuum.py, sensor.py).
+    the setup to the platform files (vacuum.py, sensor.py and the settings platforms).
     """
     # Ensure the domain data structure exists.
     hass.data.setdefault(DOMAIN, {})
@@ -57,7 +93,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
     # Create the DataUpdateCoordinator, which will manage fetching data.
-    coordinator = ViomiSECoordinator(hass, vacuum, scan_interval=scan_interval)
+    coordinator = ViomiSECoordinator(hass, entry, vacuum, scan_interval=scan_interval)
 
     # Fetch static device information (Model, FW, MAC) via miIO.info before everything else.
     # This allows entities to have correct device_info on creation.
@@ -66,32 +102,88 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Fetch initial state data (Battery, Mode, etc.) from the device before setting up the entities.
     await coordinator.async_config_entry_first_refresh()
 
+    # Load the last virtual wall set written to this robot.
+    walls = VirtualWallCache(hass, entry)
+    await walls.async_load()
+
+    # Load the per-map coordinate calibrations.
+    calibration = CalibrationManager(hass, entry)
+    await calibration.async_load()
+
+    # Aggregate cleaning runs into long-term statistics, backfilling any
+    # runs that were not pushed to the recorder before the last shutdown.
+    statistics = CleaningStatistics(hass, entry, coordinator)
+    await statistics.async_load()
+    entry.async_on_unload(coordinator.async_add_listener(statistics.async_handle_update))
+
+    # Learn discharge and charge rates for the battery estimate sensors.
+    battery = BatteryEstimator(hass, entry, coordinator)
+    await battery.async_load()
+    entry.async_on_unload(coordinator.async_add_listener(battery.async_handle_update))
+
+    # Load the room job planner, which continues any job left unfinished.
+    planner = RoomJobPlanner(hass, entry, coordinator)
+    await planner.async_load()
+    entry.async_on_unload(coordinator.async_add_listener(planner.async_handle_update))
+
+    # Schedule and do-not-disturb sync; the robot's schedule is read on first use.
+    schedule = ScheduleManager(hass, entry, coordinator)
+
+    # Settings entities share one batcher, so writes made together go out as one packet.
+    writer = WriteBatcher(hass, coordinator)
+
     # Store the coordinator, vacuum instance, and options in hass.data for the platforms to use.
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "vacuum": vacuum,
         "cooldown": cooldown,
+        "walls": walls,
+        "calibration": calibration,
+        "statistics": statistics,
+        "writer": writer,
+        "planner": planner,
+        "schedule": schedule,
+        "battery": battery,
     }
 
     # Forward the setup to the `async_setup_entry` function in each platform file.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Add a listener that will reload the integration when its options are changed.
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    # Add a listener that applies changed options without reconnecting.
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Unload the platforms (vacuum, sensor).
+    # Unload the platforms (vacuum, sensor, settings).
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         # If successful, remove the integration's data from hass.data.
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["writer"].async_shutdown()
+        await data["statistics"].async_shutdown()
+        await data["planner"].async_shutdown()
+        await data["battery"].async_shutdown()
+        # Flush a trace that is still running.
+        await data["coordinator"].async_stop_trace()
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle reloading the config entry when options are updated."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """
+    Apply updated options to the running integration.
+
+    Both options can change live, so the device session, the cached data and
+    the entities are kept instead of reloading the whole entry.
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    cooldown = entry.options.get(CONF_COMMAND_COOLDOWN, DEFAULT_COMMAND_COOLDOWN)
+    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+
+    # The vacuum entity reads the cooldown from the entry options on every command.
+    data["cooldown"] = cooldown
+    data["coordinator"].async_set_scan_interval(scan_interval)
+    _LOGGER.debug(
+        "Viomise: Options updated (cooldown: %.1f s, scan interval: %d s)", cooldown, scan_interval
+    )
@@ -0,0 +1,93 @@
+# custom_components/viomise/batcher.py
+"""Batched property writes for the Viomi SE integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import Any
+
+from miio import DeviceException
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .coordinator import MAPPING, ViomiSECoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Time (s) to wait for further writes before sending a batch.
+WRITE_WINDOW = 0.3
+
+# siid/piid of every polled property, by name.
+PROPERTIES = {prop["did"]: prop for prop in MAPPING}
+
+
+class WriteBatcher:
+    """
+    Merges property writes into a single 'set_properties' call.
+
+    Writes made within WRITE_WINDOW of the first pending one are sent in one
+    packet; a later write to the same property replaces the earlier value.
+    The values the robot accepts are applied to the coordinator data right
+    away, so entities update without waiting for the next poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: ViomiSECoordinator) -> None:
+        """Initialize the batcher."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self._pending: dict[str, Any] = {}
+        # Resolves to the result code of every property in the pending batch.
+        self._result: asyncio.Future[dict[str, int | None]] | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+
+    async def async_write(self, prop: str, value: Any) -> bool:
+        """
+        Queue a property write and wait for its batch to be sent.
+
+        Returns True if the robot accepted the value.
+        """
+        self._pending[prop] = value
+        if self._result is None:
+            self._result = self.hass.loop.create_future()
+            self._unsub = async_call_later(self.hass, WRITE_WINDOW, self._async_flush)
+        # Shielded, so a cancelled caller does not cancel the batch for the others.
+        codes = await asyncio.shield(self._result)
+        return codes.get(prop) == 0
+
+    async def _async_flush(self, _now: datetime | None = None) -> None:
+        """Send the pending writes and apply the accepted ones."""
+        self._unsub = None
+        pending, self._pending = self._pending, {}
+        result, self._result = self._result, None
+        if result is None:
+            return
+
+        codes: dict[str, int | None] = {}
+        try:
+            response = await self._coordinator.async_run_job(
+                "set_properties",
+                self._coordinator.vacuum.raw_command,
+                'set_properties',
+                [{**PROPERTIES[prop], "value": value} for prop, value in pending.items()],
+            )
+            # Results come back in the order of the request.
+            codes = {prop: item.get("code") for prop, item in zip(pending, response or [])}
+        except DeviceException as err:
+            _LOGGER.error("Viomise: Unable to write %s: %s", ", ".join(pending), err)
+        finally:
+            result.set_result(codes)
+
+        if rejected := {prop: code for prop, code in codes.items() if code != 0}:
+            _LOGGER.warning("Viomise: The vacuum rejected some settings: %s", rejected)
+        accepted = {prop: pending[prop] for prop, code in codes.items() if code == 0}
+        if accepted:
+            self._coordinator.async_set_written_data(**accepted)
+        _LOGGER.debug("Viomise: Wrote %d setting(s) in one call: %s", len(pending), codes)
+
+    async def async_shutdown(self) -> None:
+        """Send any pending writes before unloading."""
+        if self._unsub is not None:
+            self._unsub()
+            await self._async_flush()
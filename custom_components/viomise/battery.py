@@ -0,0 +1,212 @@
+# custom_components/viomise/battery.py
+"""Battery discharge and charge estimates for the Viomi SE integration."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+from .planner import BATTERY_RESERVE
+from .state import ViomiSEState
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Delay (s) used to batch writes of the learned rates to disk.
+SAVE_DELAY = 60
+
+# 'run_state' codes while the robot is cleaning (paused excluded) and charging.
+CLEANING_STATES = {5, 6, 7}
+CHARGING_STATE = 4
+# Width (%) of the battery bands that each learn their own charge rate.
+BAND_SIZE = 10
+# Battery change (%) a segment must reach before it gives a rate sample;
+# the battery is reported in whole percent, so single polls are too coarse.
+MIN_DELTA = 2
+# Longest gap (min) between two polls that still counts as one segment.
+MAX_GAP = 10
+# Weight of a new sample in the moving averages.
+ALPHA = 0.2
+# Number of discharge samples after which a setting's rate becomes its health baseline.
+BASELINE_SAMPLES = 10
+# Number of months of battery health kept.
+HEALTH_MONTHS = 24
+
+
+def _ewma(entry: dict[str, float], key: str, value: float) -> None:
+    """Fold a sample into an exponentially weighted moving average."""
+    entry[key] = value if key not in entry else entry[key] + ALPHA * (value - entry[key])
+
+
+class BatteryEstimator:
+    """
+    Learns how fast the battery drains and charges, one poll at a time.
+
+    Discharge rate (%/min) and area per percent are learned per combination
+    of sweep mode, suction and water grade; charge rate per 10 % battery
+    band. Polls are folded into the current segment in O(1), and a segment
+    becomes a sample once the battery has moved by MIN_DELTA. Battery health
+    compares each setting's current discharge rate with its early baseline.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator: ViomiSECoordinator) -> None:
+        """Initialize the estimator."""
+        self._coordinator = coordinator
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.battery"
+        )
+        # Persisted state.
+        self.discharge: dict[str, dict[str, float]] = {}
+        self.charge: dict[str, dict[str, float]] = {}
+        self.health_history: dict[str, float] = {}
+        # Current segment: what it measures, minutes, battery change and area.
+        self._segment: tuple[str, str] | None = None
+        self._seg_time = self._seg_delta = self._seg_area = 0.0
+        self._prev: ViomiSEState | None = None
+
+    async def async_load(self) -> None:
+        """Load the learned rates."""
+        if (data := await self._store.async_load()) is not None:
+            self.discharge = data.get("discharge", {})
+            self.charge = data.get("charge", {})
+            self.health_history = data.get("health", {})
+
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"discharge": self.discharge, "charge": self.charge, "health": self.health_history}
+
+    @staticmethod
+    def _setting(data: ViomiSEState) -> str:
+        """Return the key of the cleaning setting a snapshot runs with."""
+        return f"{data.mode}_{data.suction_grade}_{data.water_grade}"
+
+    @callback
+    def async_handle_update(self) -> None:
+        """Fold the latest poll into the current segment."""
+        prev, data = self._prev, self._coordinator.data
+        self._prev = data
+        if prev is None or data is None or None in (prev.battary_life, data.battary_life):
+            return
+        minutes = (data.timestamp - prev.timestamp) / 60
+        if minutes <= 0:
+            # Optimistic updates after a settings write keep the poll's timestamp.
+            return
+        if minutes > MAX_GAP:
+            self._segment = None
+            return
+
+        if data.run_state in CLEANING_STATES and prev.run_state in CLEANING_STATES:
+            setting = self._setting(data)
+            # 's_area' restarts at 0 with every run.
+            area = max(0, (data.s_area or 0) - (prev.s_area or 0))
+            self._fold(("discharge", setting), minutes, prev.battary_life - data.battary_life, area)
+            if self._seg_delta >= MIN_DELTA:
+                self._learn_discharge(setting)
+        elif data.run_state == CHARGING_STATE and prev.run_state == CHARGING_STATE:
+            band = str(min(prev.battary_life // BAND_SIZE, 100 // BAND_SIZE - 1))
+            self._fold(("charge", band), minutes, data.battary_life - prev.battary_life, 0)
+            if self._seg_delta >= MIN_DELTA:
+                self._learn_charge(band)
+        else:
+            self._segment = None
+
+    def _fold(self, segment: tuple[str, str], minutes: float, delta: float, area: float) -> None:
+        """Add one poll interval to the segment, starting a new one if needed."""
+        if segment != self._segment:
+            self._segment = segment
+            self._seg_time = self._seg_delta = self._seg_area = 0.0
+        self._seg_time += minutes
+        self._seg_delta += delta
+        self._seg_area += area
+
+    def _learn_discharge(self, setting: str) -> None:
+        """Turn the current discharge segment into a sample."""
+        entry = self.discharge.setdefault(setting, {"samples": 0})
+        _ewma(entry, "rate", self._seg_delta / self._seg_time)
+        _ewma(entry, "area", self._seg_area / self._seg_delta)
+        entry["samples"] += 1
+        if entry["samples"] == BASELINE_SAMPLES:
+            entry["baseline"] = entry["rate"]
+        self._segment = None
+        self._update_health()
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    def _learn_charge(self, band: str) -> None:
+        """Turn the current charge segment into a sample."""
+        entry = self.charge.setdefault(band, {"samples": 0})
+        _ewma(entry, "rate", self._seg_delta / self._seg_time)
+        entry["samples"] += 1
+        self._segment = None
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    def _update_health(self) -> None:
+        """Record this month's battery health."""
+        if (health := self.health) is None:
+            return
+        self.health_history[dt_util.now().strftime("%Y-%m")] = health
+        for month in sorted(self.health_history)[:-HEALTH_MONTHS]:
+            del self.health_history[month]
+
+    @property
+    def health(self) -> float | None:
+        """
+        Return the battery health (%) relative to when the rates were first learned.
+
+        Each setting past its baseline contributes baseline / current rate,
+        weighted by its number of samples.
+        """
+        rated = [e for e in self.discharge.values() if "baseline" in e and e["samples"] > BASELINE_SAMPLES]
+        if not rated:
+            return None
+        weight = sum(e["samples"] for e in rated)
+        return round(100 * sum(e["baseline"] / e["rate"] * e["samples"] for e in rated) / weight, 1)
+
+    def _discharge_entry(self, data: ViomiSEState) -> dict[str, float] | None:
+        """Return the rates of the current setting, or their average over all settings."""
+        if (entry := self.discharge.get(self._setting(data))) is not None:
+            return entry
+        if not self.discharge:
+            return None
+        entries = self.discharge.values()
+        return {key: sum(e[key] for e in entries) / len(entries) for key in ("rate", "area")}
+
+    @property
+    def cleaning_time_remaining(self) -> float | None:
+        """Return the minutes of cleaning left before the robot must return to the dock."""
+        if (data := self._coordinator.data) is None or data.battary_life is None:
+            return None
+        if (entry := self._discharge_entry(data)) is None:
+            return None
+        return round(max(0, data.battary_life - BATTERY_RESERVE) / entry["rate"])
+
+    @property
+    def area_remaining(self) -> float | None:
+        """Return the area (m²) that can still be cleaned on the current charge."""
+        if (data := self._coordinator.data) is None or data.battary_life is None:
+            return None
+        if (entry := self._discharge_entry(data)) is None:
+            return None
+        return round(max(0, data.battary_life - BATTERY_RESERVE) * entry["area"], 1)
+
+    @property
+    def time_to_full(self) -> float | None:
+        """Return the minutes needed to charge to 100 %."""
+        if (data := self._coordinator.data) is None or data.battary_life is None or not self.charge:
+            return None
+        # Bands without samples use the average rate of the others.
+        average = sum(e["rate"] for e in self.charge.values()) / len(self.charge)
+        battery, minutes = data.battary_life, 0.0
+        for band in range(min(battery // BAND_SIZE, 100 // BAND_SIZE), 100 // BAND_SIZE):
+            amount = min(100, (band + 1) * BAND_SIZE) - max(battery, band * BAND_SIZE)
+            minutes += amount / self.charge.get(str(band), {}).get("rate", average)
+        return round(minutes)
+
+    async def async_shutdown(self) -> None:
+        """Write the learned rates to disk before unloading."""
+        await self._store.async_save(self._data_to_store())
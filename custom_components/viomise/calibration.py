@@ -0,0 +1,218 @@
+# custom_components/viomise/calibration.py
+"""Coordinate calibration between map coordinates and robot metres."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+from typing import Any, Hashable, Sequence
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .walls import VirtualWall
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Number of formatted payloads kept per robot.
+PAYLOAD_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class AffineTransform:
+    """
+    Affine map from map coordinates (x, y) to robot coordinates (x', y').
+
+    x' = a*x + b*y + c
+    y' = d*x + e*y + f
+    """
+
+    a: float = 1.0
+    b: float = 0.0
+    c: float = 0.0
+    d: float = 0.0
+    e: float = 1.0
+    f: float = 0.0
+
+    @property
+    def is_identity(self) -> bool:
+        """Return True if the transform leaves coordinates untouched."""
+        return self == IDENTITY
+
+    @classmethod
+    def from_points(cls, pairs: Sequence[tuple[tuple[float, float], tuple[float, float]]]) -> AffineTransform:
+        """
+        Fit a transform from (map point, robot point) reference pairs.
+
+        Three pairs give an exact fit; more are solved by least squares.
+        """
+        if len(pairs) < 3:
+            raise ValueError("At least three calibration points are required")
+
+        # Normal equations M^T M p = M^T t with rows [x, y, 1].
+        sxx = sum(m[0] * m[0] for m, _ in pairs)
+        sxy = sum(m[0] * m[1] for m, _ in pairs)
+        syy = sum(m[1] * m[1] for m, _ in pairs)
+        sx = sum(m[0] for m, _ in pairs)
+        sy = sum(m[1] for m, _ in pairs)
+        matrix = ((sxx, sxy, sx), (sxy, syy, sy), (sx, sy, float(len(pairs))))
+
+        def rhs(axis: int) -> tuple[float, float, float]:
+            return (
+                sum(m[0] * v[axis] for m, v in pairs),
+                sum(m[1] * v[axis] for m, v in pairs),
+                sum(v[axis] for _, v in pairs),
+            )
+
+        return cls(*_solve3(matrix, rhs(0)), *_solve3(matrix, rhs(1)))
+
+    def inverse(self) -> AffineTransform:
+        """Return the transform from robot coordinates back to map coordinates."""
+        det = self.a * self.e - self.b * self.d
+        if det == 0:
+            raise ValueError("Calibration is not invertible")
+        return AffineTransform(
+            self.e / det,
+            -self.b / det,
+            (self.b * self.f - self.e * self.c) / det,
+            -self.d / det,
+            self.a / det,
+            (self.d * self.c - self.a * self.f) / det,
+        )
+
+    def apply(self, coords: Sequence[float]) -> list[float]:
+        """Transform a flat [x0, y0, x1, y1, ...] batch in one pass."""
+        if self.is_identity:
+            return list(coords)
+        a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+        xs, ys = coords[0::2], coords[1::2]
+        out = [0.0] * len(coords)
+        out[0::2] = [a * x + b * y + c for x, y in zip(xs, ys)]
+        out[1::2] = [d * x + e * y + f for x, y in zip(xs, ys)]
+        return out
+
+    def as_list(self) -> list[float]:
+        """Return the six coefficients for storage."""
+        return [self.a, self.b, self.c, self.d, self.e, self.f]
+
+
+IDENTITY = AffineTransform()
+
+
+def _solve3(m: tuple, v: tuple) -> tuple[float, float, float]:
+    """Solve a 3x3 linear system with Cramer's rule."""
+    def det(r):
+        return (
+            r[0][0] * (r[1][1] * r[2][2] - r[1][2] * r[2][1])
+            - r[0][1] * (r[1][0] * r[2][2] - r[1][2] * r[2][0])
+            + r[0][2] * (r[1][0] * r[2][1] - r[1][1] * r[2][0])
+        )
+
+    base = det(m)
+    if abs(base) < 1e-12:
+        raise ValueError("Calibration points must not be collinear")
+    return tuple(
+        det(tuple(tuple(v[r] if c == col else m[r][c] for c in range(3)) for r in range(3))) / base
+        for col in range(3)
+    )
+
+
+def _fmt(value: float) -> str:
+    """Format a coordinate for a command string."""
+    return str(round(value, 3))
+
+
+class CalibrationManager:
+    """
+    Holds one calibration per map and turns map coordinates into payloads.
+
+    Maps without a calibration use the identity transform, so coordinates
+    are passed to the robot unchanged. Formatted payloads are cached per
+    (map, request) until that map's calibration changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the calibration manager."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.calibration"
+        )
+        self._transforms: dict[int, AffineTransform] = {}
+        self._payloads: OrderedDict[Hashable, list] = OrderedDict()
+
+    async def async_load(self) -> None:
+        """Load the stored calibrations."""
+        if (data := await self._store.async_load()) is None:
+            return
+        for map_id, coefficients in data.get("maps", {}).items():
+            try:
+                self._transforms[int(map_id)] = AffineTransform(*coefficients)
+            except (TypeError, ValueError):
+                _LOGGER.warning("Viomise: Ignoring stored calibration of map '%s'", map_id)
+
+    async def async_set(self, map_id: int, transform: AffineTransform) -> None:
+        """Store the calibration of a map, or drop it if it is the identity."""
+        if transform.is_identity:
+            self._transforms.pop(map_id, None)
+        else:
+            self._transforms[map_id] = transform
+        # Drop every cached payload of this map.
+        for key in [k for k in self._payloads if k[0] == map_id]:
+            del self._payloads[key]
+        await self._store.async_save(
+            {"maps": {str(i): t.as_list() for i, t in self._transforms.items()}}
+        )
+
+    def transform(self, map_id: int | None) -> AffineTransform:
+        """Return the transform of a map."""
+        return self._transforms.get(map_id, IDENTITY)
+
+    def _cached(self, key: tuple, build) -> list:
+        """Return a cached payload, building it on a miss."""
+        if (payload := self._payloads.get(key)) is not None:
+            self._payloads.move_to_end(key)
+        else:
+            payload = self._payloads[key] = build()
+            if len(self._payloads) > PAYLOAD_CACHE_SIZE:
+                self._payloads.popitem(last=False)
+        return list(payload)
+
+    def zone_payload(self, map_id: int | None, zones: list[list[float]], repeats: int) -> list:
+        """
+        Build the 'set_zone' parameters for a list of [x1, y2, x2, y1] zones.
+
+        Every corner of every zone is transformed in a single batch.
+        """
+        key = (map_id, "zone", tuple(tuple(z) for z in zones), repeats)
+
+        def build() -> list:
+            # Corners in the order the robot expects: (x1,y1) (x1,y2) (x2,y2) (x2,y1).
+            corners = [c for x1, y2, x2, y1 in zones for c in (x1, y1, x1, y2, x2, y2, x2, y1)]
+            values = [_fmt(v) for v in self.transform(map_id).apply(corners)]
+            entries = [
+                "_".join([str(index), "0", *values[zone * 8:zone * 8 + 8]])
+                for index, zone in enumerate(z for z in range(len(zones)) for _ in range(repeats))
+            ]
+            return [len(entries), *entries]
+
+        return self._cached(key, build)
+
+    def point(self, map_id: int | None, x: float, y: float) -> tuple[float, float]:
+        """Transform a single point."""
+        tx, ty = self.transform(map_id).apply((x, y))
+        return round(tx, 3), round(ty, 3)
+
+    def walls(self, map_id: int | None, walls: list[VirtualWall], inverse: bool = False) -> list[VirtualWall]:
+        """Transform every point of a wall set in one batch (map to robot, or back)."""
+        transform = self.transform(map_id)
+        if transform.is_identity:
+            return walls
+        if inverse:
+            transform = transform.inverse()
+        values = iter(transform.apply([c for w in walls for p in w.points for c in p]))
+        return [
+            VirtualWall(w.wall_id, tuple((next(values), next(values)) for _ in w.points))
+            for w in walls
+        ]
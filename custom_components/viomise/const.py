@@ -17,3 +17,8 @@ CONF_SCAN_INTERVAL = "scan_interval"
 DEFAULT_COMMAND_COOLDOWN = 2.5  # seconds
 DEFAULT_SCAN_INTERVAL = 30      # seconds
 
+# Event fired on the bus whenever the reported fault code changes.
+EVENT_FAULT = f"{DOMAIN}_fault"
+
+# Event fired on the bus when a multi-run room job has cleaned every room.
+EVENT_ROOM_JOB_FINISHED = f"{DOMAIN}_room_job_finished"
@@ -1,31 +1,30 @@
 # custom_components/viomise/coordinator.py
 """DataUpdateCoordinator for the Viomi SE integration."""
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
 
 from miio import DeviceException, ViomiVacuum
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import slugify
 
-from .const import DOMAIN
+from .const import DOMAIN, EVENT_FAULT
+from .state import ViomiSEState
+from .tracing import PerformanceTrace
 
 _LOGGER = logging.getLogger(__name__)
 
-# This list defines all the properties we want to fetch from the vacuum.
-ALL_PROPS = [
-    "run_state", "mode", "err_state", "battary_life", "box_type", "mop_type",
-    "s_time", "s_area", "suction_grade", "water_grade", "remember_map", "has_map",
-    "is_mop", "has_newmap", "main_brush_percentage", "main_brush_left",
-    "side_brush_percentage", "side_brush_left", "filter_percentage", "filter_left",
-    "mop_percentage", "mop_left", "repeat_state", "mop_route", "current_map_id"
-]
-
 # This mapping is crucial for this specific vacuum model (viomi.vacuum.v19).
 # It translates the human-readable property names to the required siid/piid format.
+# The order must match the fields of ViomiSEState, which is filled by position.
 MAPPING = [
     {"did":"run_state","siid":2,"piid":1}, {"did":"mode","siid":2,"piid":18},
     {"did":"err_state","siid":2,"piid":2}, {"did":"battary_life","siid":3,"piid":1},
@@ -39,26 +38,115 @@ MAPPING = [
     {"did":"filter_percentage","siid":4,"piid":12}, {"did":"filter_left","siid":4,"piid":13},
     {"did":"mop_percentage","siid":4,"piid":14}, {"did":"mop_left","siid":4,"piid":15},
     {"did":"repeat_state","siid":4,"piid":1}, {"did":"mop_route","siid":4,"piid":6},
-    {"did":"current_map_id","siid":4,"piid":32}
+    {"did":"current_map_id","siid":4,"piid":32}, {"did":"volume","siid":2,"piid":17}
 ]
 
+# Number of properties requested per 'get_properties' call.
+PROPERTIES_PER_CALL = 13
 
-class ViomiSECoordinator(DataUpdateCoordinator[dict[str, any]]):
+
+class ViomiSECoordinator(DataUpdateCoordinator[ViomiSEState]):
     """Manages fetching data from the Viomi SE vacuum for all entities."""
 
-    def __init__(self, hass: HomeAssistant, vacuum: ViomiVacuum, scan_interval: int):
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, vacuum: ViomiVacuum, scan_interval: int):
         """Initialize the data update coordinator."""
         self.vacuum = vacuum
         # Dictionary to store hardware info (model, fw_ver, mac, etc.)
         self.device_info_data = {}
+        # Incremented on every successful poll and stored in the snapshot.
+        self._version = 0
+        # Active performance trace; None whenever tracing is off.
+        self.trace: PerformanceTrace | None = None
+        self._trace_unsub: CALLBACK_TYPE | None = None
         
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=entry,
             name=DOMAIN,
             update_interval=timedelta(seconds=scan_interval),
         )
 
+    @callback
+    def async_set_scan_interval(self, scan_interval: int) -> None:
+        """Change the polling interval without restarting the coordinator."""
+        self.update_interval = timedelta(seconds=scan_interval)
+        # Reschedule the pending poll so the new interval applies right away.
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_set_written_data(self, **changes: Any) -> None:
+        """
+        Publish properties just written to the device without polling it.
+
+        The snapshot gets a new version but keeps the timestamp of the poll
+        it was derived from, since no new values were read.
+        """
+        if self.data is None:
+            return
+        self._version += 1
+        self.async_set_updated_data(self.data._replace(version=self._version, **changes))
+
+    @callback
+    def async_run_job(self, name: str, func: Callable, *args: Any) -> Awaitable[Any]:
+        """
+        Run a blocking device call in the executor, timed when tracing.
+
+        Returns the executor future itself when tracing is off, so the
+        untraced path adds no extra coroutine.
+        """
+        if (trace := self.trace) is None:
+            return self.hass.async_add_executor_job(func, *args)
+        return trace.async_run_job(self.hass, name, func, *args)
+
+    @callback
+    def async_start_trace(self, duration: float, profile: bool = False) -> None:
+        """Start tracing the poll and command paths for `duration` seconds."""
+        if self.trace is not None:
+            raise ServiceValidationError(
+                f"A trace is already running for {self.config_entry.title}; stop it before starting a new one"
+            )
+        self.trace = PerformanceTrace(self.config_entry.title, profile)
+        # Time the miIO handshake by shadowing the method on this device's
+        # protocol instance only; it is removed again when the trace stops.
+        protocol = getattr(self.vacuum, "_protocol", None)
+        if protocol is not None and hasattr(protocol, "send_handshake"):
+            protocol.send_handshake = self.trace.wrap("miio handshake", protocol.send_handshake)
+        self._trace_unsub = async_call_later(self.hass, duration, self._async_trace_timeout)
+        _LOGGER.info("Viomise: Tracing %s for %.0f s", self.config_entry.title, duration)
+
+    async def _async_trace_timeout(self, _now: datetime) -> None:
+        """Stop the trace when its window ends."""
+        self._trace_unsub = None
+        await self.async_stop_trace()
+
+    async def async_stop_trace(self) -> dict[str, str] | None:
+        """Stop tracing and write the results to the config directory."""
+        if (trace := self.trace) is None:
+            return None
+        self.trace = None
+        if self._trace_unsub is not None:
+            self._trace_unsub()
+            self._trace_unsub = None
+        protocol = getattr(self.vacuum, "_protocol", None)
+        if protocol is not None and "send_handshake" in vars(protocol):
+            del protocol.send_handshake
+
+        path = self.hass.config.path(
+            f"{DOMAIN}_trace_{slugify(self.config_entry.title)}_{int(trace.started)}.json"
+        )
+        return await self.hass.async_add_executor_job(trace.write, path)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, timing the entity state writes when tracing."""
+        if (trace := self.trace) is None:
+            super().async_update_listeners()
+            return
+        with trace.span("entity state writes", listeners=len(self._listeners)):
+            super().async_update_listeners()
+
     async def async_fetch_device_info(self):
         """
         Fetch static device information (model, firmware, MAC) once.
@@ -79,32 +167,54 @@ class ViomiSECoordinator(DataUpdateCoordinator[dict[str, any]]):
         except DeviceException as e:
             _LOGGER.warning("Viomise: Failed to fetch static device info: %s", e)
 
-    async def _async_update_data(self) -> dict[str, any]:
+    async def _async_update_data(self) -> ViomiSEState:
         """
         Fetch data from the vacuum using the specific dual-call method.
 
         This device model does not return all properties in a single call.
-        It requires two separate 'get_properties' calls, each with a maximum
-        of 12 properties.
+        It requires two separate 'get_properties' calls, each with at most
+        PROPERTIES_PER_CALL properties.
         """
         try:
-            # First call for the first 12 properties.
-            properties = await self.hass.async_add_executor_job(
-                self.vacuum.raw_command, 'get_properties', MAPPING[:12]
+            # First call for the first half of the properties.
+            first = await self.async_run_job(
+                "get_properties (1/2)", self.vacuum.raw_command, 'get_properties', MAPPING[:PROPERTIES_PER_CALL]
             )
             # Second call for the remaining properties.
-            properties.extend(await self.hass.async_add_executor_job(
-                self.vacuum.raw_command, 'get_properties', MAPPING[12:]
-            ))
-
-            # Extract only the 'value' from each returned dictionary,
-            # checking for errors (code != 0).
-            state_values = [p.get('value') if p.get('code') == 0 else None for p in properties]
-
-            # Combine the property names (ALL_PROPS) with their fetched values
-            # into a single, easy-to-use dictionary.
-            return dict(zip(ALL_PROPS, state_values))
-
+            second = await self.async_run_job(
+                "get_properties (2/2)", self.vacuum.raw_command, 'get_properties', MAPPING[PROPERTIES_PER_CALL:]
+            )
         except DeviceException as e:
             # If communication fails, raise UpdateFailed to notify entities.
             raise UpdateFailed(f"Error communicating with Viomi SE device: {e}") from e
+
+        # Build the typed snapshot directly from both responses; properties
+        # with an error code (code != 0) are stored as None.
+        try:
+            data = ViomiSEState.from_response(self._version + 1, first, second)
+        except TypeError as e:
+            # Raised when the device answers with a different number of properties.
+            raise UpdateFailed(f"Unexpected response from Viomi SE device: {e}") from e
+        self._version = data.version
+
+        self._fire_fault_event(data)
+        return data
+
+    def _fire_fault_event(self, data: ViomiSEState) -> None:
+        """Fire an event on the bus when the fault code changes between polls."""
+        # Nothing to compare against on the first refresh.
+        if self.data is None or data.err_state in (None, self.data.err_state):
+            return
+        previous, current = self.data.err_state, data.err_state
+        _LOGGER.debug("Viomise: Fault code changed from %s to %s", previous, current)
+        self.hass.bus.async_fire(
+            EVENT_FAULT,
+            {
+                "entry_id": self.config_entry.entry_id,
+                "name": self.config_entry.title,
+                "code": current,
+                "fault": data.fault,
+                "previous_code": previous,
+                "previous_fault": self.data.fault,
+            },
+        )
@@ -0,0 +1,34 @@
+# custom_components/viomise/entity.py
+"""Base entity for the Viomi SE integration."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+
+
+class ViomiSEEntity(CoordinatorEntity[ViomiSECoordinator]):
+    """An entity of the vacuum device that reads from the coordinator."""
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: ViomiSECoordinator, config_entry: ConfigEntry, key: str) -> None:
+        """Initialize the entity and link it to the vacuum device."""
+        super().__init__(coordinator)
+
+        # Use the unique_id set in the config flow (which already includes the _viomise suffix)
+        self._attr_unique_id = f"{config_entry.unique_id}_{key}"
+
+        # Use dynamic device information from miIO.info stored in the coordinator.
+        info = coordinator.device_info_data
+
+        # Link this entity to the same device as the vacuum entity.
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, config_entry.unique_id)},
+            "name": config_entry.title,
+            "manufacturer": "Viomi",
+            "model": info.get("model", "Viomi SE (V19)"),
+            "sw_version": info.get("fw_ver"),
+            "hw_version": info.get("hw_ver"),
+        }
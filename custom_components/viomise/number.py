@@ -0,0 +1,77 @@
+# custom_components/viomise/number.py
+"""Number platform for Viomi SE settings."""
+from __future__ import annotations
+import logging
+from dataclasses import dataclass
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .batcher import WriteBatcher
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+from .entity import ViomiSEEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(frozen=True, kw_only=True)
+class ViomiSENumberEntityDescription(NumberEntityDescription):
+    """Describes a Viomi SE number entity."""
+    # Name of the writable integer property in coordinator.MAPPING.
+    prop: str
+
+NUMBER_DESCRIPTIONS: tuple[ViomiSENumberEntityDescription, ...] = (
+    # siid 2 / piid 17 (Mute): 0 mutes the voice, 1-10 set its volume.
+    ViomiSENumberEntityDescription(
+        key="volume",
+        name="Volume",
+        translation_key="volume",
+        icon="mdi:volume-high",
+        entity_category=EntityCategory.CONFIG,
+        native_min_value=0,
+        native_max_value=10,
+        native_step=1,
+        mode=NumberMode.SLIDER,
+        prop="volume",
+    ),
+)
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    """Set up the Viomi SE number platform from a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        ViomiSENumber(data["coordinator"], entry, data["writer"], description)
+        for description in NUMBER_DESCRIPTIONS
+    )
+
+class ViomiSENumber(ViomiSEEntity, NumberEntity):
+    """A numeric setting of the vacuum."""
+    entity_description: ViomiSENumberEntityDescription
+
+    def __init__(
+        self,
+        coordinator: ViomiSECoordinator,
+        config_entry: ConfigEntry,
+        writer: WriteBatcher,
+        description: ViomiSENumberEntityDescription,
+    ):
+        """Initialize the number entity."""
+        super().__init__(coordinator, config_entry, description.key)
+        self.entity_description = description
+        self._writer = writer
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the current value of the setting."""
+        if not self.coordinator.data:
+            return None
+        return getattr(self.coordinator.data, self.entity_description.prop)
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Write the new value to the vacuum."""
+        if not await self._writer.async_write(self.entity_description.prop, int(value)):
+            raise HomeAssistantError(f"The vacuum did not accept {self.entity_description.key} = {int(value)}")
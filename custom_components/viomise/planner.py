@@ -0,0 +1,403 @@
+# custom_components/viomise/planner.py
+"""Multi-run room cleaning jobs for the Viomi SE integration."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, EVENT_ROOM_JOB_FINISHED
+from .coordinator import ViomiSECoordinator
+from .state import ViomiSEState
+from .statistics import FAULT_NOTICE_MIN, RESUME_CODE, RESUME_TIMEOUT, RUN_STATES
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Delay (s) used to batch writes of the job state to disk.
+SAVE_DELAY = 10
+
+# 'run_state' codes at which the robot can take the next batch (sleep, idle, charging).
+READY_STATES = {0, 1, 4}
+# 'run_state' a run ends in when it is stopped rather than finished.
+IDLE_STATE = 1
+# Fault codes that mean a run was cut short for lack of battery.
+LOW_BATTERY_CODES = {502}
+
+# Battery (%) kept in reserve for the trip back to the dock.
+BATTERY_RESERVE = 20
+# Default battery (%) to recharge to before the next batch starts.
+DEFAULT_RESUME_BATTERY = 80
+# Estimated battery draw (%) of a room that has not been cleaned by a job yet.
+DEFAULT_ROOM_BATTERY = 15
+# Weight of a new observation in the per-room averages.
+HISTORY_ALPHA = 0.3
+# Share of the rooms' known area a run must clean to count as complete.
+COVERAGE_RATIO = 0.8
+# Time (s) a dispatched batch may take to start before it is sent again.
+START_TIMEOUT = 120
+
+# Job phases.
+PHASE_WAITING = "waiting"    # Waiting for the robot to be docked or charged.
+PHASE_STARTING = "starting"  # Batch sent, waiting for the robot to start cleaning.
+PHASE_CLEANING = "cleaning"  # Batch in progress.
+PHASE_PAUSED = "paused"      # Batch stopped without a fault, waiting for resume_room_job.
+
+
+class RoomJobPlanner:
+    """
+    Splits a room list into batches that each fit in one battery charge.
+
+    Each room's duration, battery draw and area are learned from completed
+    batches as moving averages. A job sends one batch at a time through the
+    vacuum entity, follows it through the 'run_state' transitions of every
+    poll and, once the robot is docked and recharged to the resume level,
+    sends the next one. A batch cut short by low battery raises the draw
+    of its unfinished rooms and is sent again after a full recharge; it is
+    only split when it failed on one. A batch stopped without a fault
+    pauses the job. The job and the room history are persisted, so a job
+    continues after a Home Assistant restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator: ViomiSECoordinator) -> None:
+        """Initialize the planner."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self._entry_id = entry.entry_id
+        self._title = entry.title
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.room_jobs"
+        )
+        # Persisted state. Room ids are strings in the history, as in the stored JSON.
+        self.history: dict[str, dict[str, float]] = {}
+        self.job: dict[str, Any] | None = None
+        # Sends a batch of rooms to the robot; set by the vacuum entity.
+        self._dispatch: Callable[[list[int]], Awaitable[bool]] | None = None
+        self._dispatching = False
+
+    async def async_load(self) -> None:
+        """Load the room history and any unfinished job."""
+        if (data := await self._store.async_load()) is not None:
+            self.history = data.get("history", {})
+            self.job = data.get("job")
+        if self.job is not None:
+            _LOGGER.info(
+                "Viomise: Resuming room job for %s (%d room(s) left)", self._title, len(self.job["rooms"])
+            )
+
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"history": self.history, "job": self.job}
+
+    @callback
+    def async_set_dispatcher(self, dispatch: Callable[[list[int]], Awaitable[bool]]) -> CALLBACK_TYPE:
+        """Set the function that starts a batch; returns a callback to remove it."""
+        self._dispatch = dispatch
+
+        @callback
+        def remove() -> None:
+            self._dispatch = None
+
+        return remove
+
+    def _draw(self, rooms: list[int]) -> float:
+        """Return the estimated battery draw (%) of a list of rooms."""
+        return sum(self.history.get(str(room), {}).get("battery", DEFAULT_ROOM_BATTERY) for room in rooms)
+
+    def plan(
+        self, rooms: list[int], battery: float, resume_battery: float, max_rooms: int | None = None
+    ) -> list[list[int]]:
+        """
+        Split rooms into batches, keeping their order.
+
+        The first batch fits in the current battery, the later ones in a
+        charge up to the resume level, always leaving BATTERY_RESERVE for
+        the way back. No batch holds more than max_rooms rooms. A room that
+        does not fit in any charge gets a batch of its own.
+        """
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        budget, used = battery - BATTERY_RESERVE, 0.0
+        for room in rooms:
+            draw = self._draw([room])
+            if batch and (used + draw > budget or (max_rooms and len(batch) >= max_rooms)):
+                batches.append(batch)
+                batch, used = [], 0.0
+                budget = resume_battery - BATTERY_RESERVE
+            batch.append(room)
+            used += draw
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def async_start(self, rooms: list[int], resume_battery: int) -> dict[str, Any]:
+        """Start a job for a list of rooms, replacing any unfinished one."""
+        if self.job is not None:
+            _LOGGER.info("Viomise: Replacing the unfinished room job of %s", self._title)
+        # Drop repeated rooms, keeping the first occurrence.
+        rooms = list(dict.fromkeys(rooms))
+        self.job = {
+            "rooms": rooms,
+            "done": [],
+            "batch": [],
+            "phase": PHASE_WAITING,
+            "since": time.time(),
+            "start_battery": None,
+            "batch_battery": None,
+            "used_battery": None,
+            "recharging": False,
+            "max_rooms": None,
+            "incomplete": [],
+            "resume_battery": resume_battery,
+        }
+        battery = (self._coordinator.data and self._coordinator.data.battary_life) or 0
+        batches = self.plan(rooms, battery, resume_battery)
+        _LOGGER.info("Viomise: Starting room job for %s in %d batch(es): %s", self._title, len(batches), batches)
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        # Send the first batch right away if the robot is ready.
+        self.async_handle_update()
+        return {"batches": batches}
+
+    async def async_cancel(self) -> None:
+        """Forget the current job. A batch already running is not stopped."""
+        if self.job is None:
+            return
+        _LOGGER.info("Viomise: Cancelled room job for %s (%d room(s) left)", self._title, len(self.job["rooms"]))
+        self.job = None
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    async def async_resume(self) -> None:
+        """Continue a job that was paused because its batch was stopped."""
+        if self.job is None or self.job["phase"] != PHASE_PAUSED:
+            return
+        _LOGGER.info("Viomise: Resuming room job for %s (%d room(s) left)", self._title, len(self.job["rooms"]))
+        self.job["phase"] = PHASE_WAITING
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        self.async_handle_update()
+
+    @callback
+    def async_handle_update(self) -> None:
+        """Advance the job from every coordinator update."""
+        if (job := self.job) is None or (data := self._coordinator.data) is None:
+            return
+
+        if job["phase"] == PHASE_STARTING:
+            if data.run_state in RUN_STATES:
+                job.update(
+                    phase=PHASE_CLEANING,
+                    since=data.timestamp,
+                    start_battery=data.battary_life,
+                    batch_battery=data.battary_life,
+                    used_battery=None,
+                )
+                self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+            elif data.timestamp - job["since"] > START_TIMEOUT:
+                _LOGGER.warning("Viomise: Batch %s did not start, sending it again", job["batch"])
+                job.update(phase=PHASE_WAITING, batch=[])
+        elif job["phase"] == PHASE_CLEANING:
+            if data.run_state in RUN_STATES:
+                if job.get("recharging"):
+                    _LOGGER.info("Viomise: Batch %s resumed after recharging", job["batch"])
+                    job.update(recharging=False, start_battery=data.battary_life)
+                    self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+            elif data.err_state == RESUME_CODE and not job.get("recharging"):
+                # The firmware docks, recharges and resumes the run by itself,
+                # so the batch stays in progress instead of being sent again.
+                _LOGGER.info("Viomise: Batch %s paused to recharge", job["batch"])
+                job.update(
+                    recharging=True,
+                    since=data.timestamp,
+                    used_battery=self._battery_used(job, data),
+                    start_battery=None,
+                )
+                self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+            elif job.get("recharging") and data.timestamp - job["since"] <= RESUME_TIMEOUT:
+                # Still docked, waiting for the firmware to resume the run.
+                return
+            elif data.run_state is not None:
+                self._finish_batch(job, data)
+                if self.job is None:
+                    return
+
+        if job["phase"] == PHASE_WAITING:
+            self._async_maybe_dispatch(job, data)
+
+    @staticmethod
+    def _battery_used(job: dict[str, Any], data: ViomiSEState) -> float | None:
+        """Return the battery (%) the running batch has used, across recharges."""
+        used = job.get("used_battery")
+        if job["start_battery"] is not None:
+            used = (used or 0) + max(0, job["start_battery"] - (data.battary_life or 0))
+        return used
+
+    @callback
+    def _finish_batch(self, job: dict[str, Any], data: ViomiSEState) -> None:
+        """Record the rooms a finished run covered and requeue the rest."""
+        batch = job["batch"]
+        fault = data.err_state
+        used = self._battery_used(job, data)
+        # A run that did not resume after recharging ran out of battery as well.
+        low_battery = job.get("recharging") or fault in LOW_BATTERY_CODES
+        skipped: list[int] = []
+        phase = PHASE_WAITING
+        if low_battery or (fault and fault < FAULT_NOTICE_MIN):
+            # The run was cut short; 's_area' tells how far it got.
+            done = self._rooms_covered(batch, data.s_area or 0)
+            _LOGGER.info(
+                "Viomise: Batch %s stopped early (fault %s), %s done", batch, fault, done
+            )
+            if low_battery:
+                self._learn_partial(batch, done, data, used)
+                # A run started on a partial charge is simply sent again once
+                # the raised estimate has made the robot charge up for it.
+                full_charge = (job.get("batch_battery") or 0) >= job["resume_battery"]
+                if not done and full_charge and len(batch) > 1:
+                    # Nothing was finished, so the next batches must be smaller.
+                    job["max_rooms"] = len(batch) - 1
+                elif not done and full_charge:
+                    # A room that does not fit in a full charge would be sent forever.
+                    _LOGGER.warning("Viomise: Room %s does not fit in one charge, skipping it", batch[0])
+                    skipped = batch
+        elif self._batch_complete(batch, data):
+            done = batch
+            self._learn(batch, data, used)
+        else:
+            # Stopped or sent home before the rooms were done: the rest waits
+            # for resume_room_job instead of being sent straight back.
+            done = self._rooms_covered(batch, data.s_area or 0)
+            phase = PHASE_PAUSED
+            _LOGGER.info("Viomise: Batch %s stopped with %s done, pausing the room job", batch, done)
+
+        job["done"].extend(done)
+        job.setdefault("incomplete", []).extend(skipped)
+        job["rooms"] = [room for room in job["rooms"] if room not in done and room not in skipped]
+        job.update(
+            phase=phase,
+            batch=[],
+            since=data.timestamp,
+            start_battery=None,
+            batch_battery=None,
+            used_battery=None,
+            recharging=False,
+        )
+
+        if not job["rooms"]:
+            _LOGGER.info("Viomise: Room job for %s finished: %s", self._title, job["done"])
+            self.hass.bus.async_fire(
+                EVENT_ROOM_JOB_FINISHED,
+                {
+                    "entry_id": self._entry_id,
+                    "name": self._title,
+                    "rooms": job["done"],
+                    "incomplete": job["incomplete"],
+                },
+            )
+            self.job = None
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    def _batch_complete(self, batch: list[int], data: ViomiSEState) -> bool:
+        """
+        Return True if a run that ended without a fault cleaned its whole batch.
+
+        A run the robot was stopped in never is. Otherwise 's_area' must
+        reach COVERAGE_RATIO of the rooms' known area; rooms that have not
+        been learned yet cannot be checked and are taken as done.
+        """
+        if data.run_state == IDLE_STATE:
+            return False
+        known = sum(self.history.get(str(room), {}).get("area", 0) for room in batch)
+        return (data.s_area or 0) >= COVERAGE_RATIO * known
+
+    def _rooms_covered(self, batch: list[int], area: float) -> list[int]:
+        """
+        Return the leading rooms of a batch that fit in the cleaned area.
+
+        Assumes the robot cleans the rooms in the order they were sent.
+        Counting stops at the first room without a known area.
+        """
+        covered: list[int] = []
+        total = 0.0
+        for room in batch:
+            if (room_area := self.history.get(str(room), {}).get("area")) is None:
+                break
+            total += room_area
+            if total > area:
+                break
+            covered.append(room)
+        return covered
+
+    def _learn(self, batch: list[int], data: ViomiSEState, used: float | None) -> None:
+        """Update the per-room averages from a completed batch."""
+        if not batch or used is None:
+            return
+        totals = {
+            "duration": data.s_time or 0,
+            "area": data.s_area or 0,
+            "battery": used,
+        }
+        # The run totals are shared out by the rooms' known areas; rooms
+        # without one count as the average of the others.
+        known = [self.history[str(r)]["area"] for r in batch if self.history.get(str(r), {}).get("area")]
+        default = sum(known) / len(known) if known else 1.0
+        weights = [self.history.get(str(r), {}).get("area") or default for r in batch]
+        scale = sum(weights)
+
+        for room, weight in zip(batch, weights):
+            entry = self.history.setdefault(str(room), {})
+            for key, total in totals.items():
+                value = total * weight / scale
+                entry[key] = value if key not in entry else entry[key] + HISTORY_ALPHA * (value - entry[key])
+            entry["runs"] = entry.get("runs", 0) + 1
+
+    def _learn_partial(self, batch: list[int], done: list[int], data: ViomiSEState, used: float | None) -> None:
+        """
+        Raise the battery draw of the rooms a run ran out of battery on.
+
+        The battery used per m² of the run, times the area cleaned beyond
+        the finished rooms, is a lower bound for what the unfinished rooms
+        need, so their estimate is raised to at least their share of it.
+        """
+        area = data.s_area or 0
+        left = [room for room in batch if room not in done]
+        if not left or not used or area <= 0:
+            return
+        finished = sum(self.history[str(room)]["area"] for room in done)
+        needed = used / area * max(0.0, area - finished)
+        for room in left:
+            entry = self.history.setdefault(str(room), {})
+            entry["battery"] = max(entry.get("battery", DEFAULT_ROOM_BATTERY), needed / len(left))
+
+    @callback
+    def _async_maybe_dispatch(self, job: dict[str, Any], data: ViomiSEState) -> None:
+        """Send the next batch once the robot is ready and charged enough."""
+        if self._dispatching or self._dispatch is None or data.run_state not in READY_STATES:
+            return
+        battery = data.battary_life or 0
+        batch = self.plan(job["rooms"], battery, job["resume_battery"], job.get("max_rooms"))[0]
+        # Wait for the charge unless the resume level is already reached.
+        if battery < job["resume_battery"] and self._draw(batch) > battery - BATTERY_RESERVE:
+            return
+        # Set here, so the refresh that follows the command cannot send it twice.
+        self._dispatching = True
+        self.hass.async_create_task(self._async_dispatch(job, batch))
+
+    async def _async_dispatch(self, job: dict[str, Any], batch: list[int]) -> None:
+        """Send a batch to the robot."""
+        try:
+            sent = await self._dispatch(batch)
+        finally:
+            self._dispatching = False
+        # The job may have been cancelled or replaced in the meantime.
+        if not sent or self.job is not job:
+            return
+        job.update(batch=batch, phase=PHASE_STARTING, since=time.time())
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        _LOGGER.info("Viomise: Sent batch %s (%d room(s) left)", batch, len(job["rooms"]))
+
+    async def async_shutdown(self) -> None:
+        """Write the job state to disk before unloading."""
+        await self._store.async_save(self._data_to_store())
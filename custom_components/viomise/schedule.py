@@ -0,0 +1,398 @@
+# custom_components/viomise/schedule.py
+"""Scheduled cleanings and do-not-disturb sync for the Viomi SE integration."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, replace
+from datetime import time as dt_time
+import json
+import logging
+import time
+from typing import Any
+
+from miio import DeviceException
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util.yaml import load_yaml
+
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# File in the config directory with the desired schedule of every robot.
+SCHEDULE_FILE = f"{DOMAIN}_schedules.yaml"
+# Number of robots reconciled at the same time.
+RECONCILE_PARALLELISM = 4
+# Time (s) the appointments read from a robot are reused before reading them again.
+CACHE_TTL = 3600
+
+# Days in the order of the siid 5 / piid 3 bitmask (bit0 = Sunday).
+DAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+# Writable siid 5 properties that describe one appointment, in payload order.
+APPOINTMENT_PIIDS = (
+    ("order_id", 1), ("enabled", 2), ("days", 3), ("hour", 4), ("minute", 5), ("repeat", 6),
+    ("mode", 8), ("suction", 9), ("water", 10), ("twice", 11), ("map_id", 12),
+    ("room_count", 13), ("rooms", 14),
+)
+# siid 5 do-not-disturb properties (readable and writable).
+DND_PROPERTIES = [
+    {"did": f"dnd_{name}", "siid": 5, "piid": piid}
+    for name, piid in (("enabled", 15), ("start_hour", 16), ("start_minute", 17), ("end_hour", 18), ("end_minute", 19))
+]
+# siid 5 actions: delete one appointment (in: piid 1), get all of them (out: piid 22).
+ACTION_DELETE = {"did": "call-5-2", "siid": 5, "aiid": 2}
+ACTION_GET = {"did": "call-5-3", "siid": 5, "aiid": 3}
+
+
+def _unique_ids(appointments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Reject appointment lists that use the same id twice."""
+    ids = [a["id"] for a in appointments]
+    if len(ids) != len(set(ids)):
+        raise vol.Invalid("Appointment ids must be unique")
+    return appointments
+
+
+APPOINTMENT_SCHEMA = vol.Schema({
+    vol.Required("id"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    vol.Optional("enabled", default=True): cv.boolean,
+    vol.Required("days"): vol.All(cv.ensure_list, [vol.All(vol.Lower, vol.In(DAYS))]),
+    vol.Required("time"): cv.time,
+    vol.Optional("repeat", default=True): cv.boolean,
+    vol.Optional("mode", default=0): vol.All(vol.Coerce(int), vol.In([0, 1, 2])),
+    vol.Optional("suction", default=1): vol.All(vol.Coerce(int), vol.Range(min=0, max=3)),
+    vol.Optional("water", default=1): vol.All(vol.Coerce(int), vol.Range(min=0, max=2)),
+    vol.Optional("twice", default=False): cv.boolean,
+    vol.Optional("map_id", default=0): vol.Coerce(int),
+    vol.Optional("rooms", default=[]): [{
+        vol.Required("id"): vol.Coerce(int),
+        vol.Optional("name", default=""): cv.string,
+    }],
+})
+DND_SCHEMA = vol.Schema({
+    vol.Required("enabled"): cv.boolean,
+    vol.Optional("start", default="22:00"): cv.time,
+    vol.Optional("end", default="08:00"): cv.time,
+})
+# Leaving out 'appointments' or 'do_not_disturb' keeps that part as it is.
+SCHEDULE_SCHEMA = {
+    vol.Optional("appointments"): vol.All(cv.ensure_list, [APPOINTMENT_SCHEMA], _unique_ids),
+    vol.Optional("do_not_disturb"): DND_SCHEMA,
+}
+# The schedule file maps a robot (config entry title or host) to its schedule.
+SCHEDULE_FILE_SCHEMA = vol.Schema({cv.string: vol.Any(None, vol.Schema(SCHEDULE_SCHEMA))})
+
+
+def _hhmm(hour: int, minute: int) -> str:
+    """Format a time of day."""
+    return f"{hour:02d}:{minute:02d}"
+
+
+@dataclass(frozen=True)
+class Appointment:
+    """One scheduled cleaning (an 'appointment' in the spec)."""
+
+    order_id: int
+    enabled: bool
+    days: int
+    hour: int
+    minute: int
+    repeat: bool
+    mode: int
+    suction: int
+    water: int
+    twice: bool
+    map_id: int
+    rooms: tuple[tuple[int, str], ...] = ()
+
+    @classmethod
+    def from_config(cls, conf: dict[str, Any]) -> Appointment:
+        """Build an appointment from validated service or file data."""
+        start: dt_time = conf["time"]
+        return cls(
+            order_id=conf["id"],
+            enabled=conf["enabled"],
+            days=sum(1 << DAYS.index(day) for day in set(conf["days"])),
+            hour=start.hour,
+            minute=start.minute,
+            repeat=conf["repeat"],
+            mode=conf["mode"],
+            suction=conf["suction"],
+            water=conf["water"],
+            twice=conf["twice"],
+            map_id=conf["map_id"],
+            rooms=tuple((room["id"], room["name"]) for room in conf["rooms"]),
+        )
+
+    @property
+    def key(self) -> Appointment:
+        """Return the appointment without room names, which the robot may not report back as sent."""
+        return replace(self, rooms=tuple((room_id, "") for room_id, _ in self.rooms))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the appointment in the same shape the services accept."""
+        return {
+            "id": self.order_id,
+            "enabled": self.enabled,
+            "days": [day for bit, day in enumerate(DAYS) if self.days & (1 << bit)],
+            "time": _hhmm(self.hour, self.minute),
+            "repeat": self.repeat,
+            "mode": self.mode,
+            "suction": self.suction,
+            "water": self.water,
+            "twice": self.twice,
+            "map_id": self.map_id,
+            "rooms": [{"id": room_id, "name": name} for room_id, name in self.rooms],
+        }
+
+    def properties(self) -> list[dict[str, Any]]:
+        """Return the 'set_properties' payload that stores this appointment."""
+        rooms = json.dumps([{"name": name, "id": room_id} for room_id, name in self.rooms], ensure_ascii=False)
+        values = (
+            self.order_id, int(self.enabled), self.days, self.hour, self.minute, int(self.repeat),
+            self.mode, self.suction, self.water, int(self.twice), self.map_id, len(self.rooms), rooms,
+        )
+        return [
+            {"did": f"appointment_{name}", "siid": 5, "piid": piid, "value": value}
+            for (name, piid), value in zip(APPOINTMENT_PIIDS, values)
+        ]
+
+
+@dataclass(frozen=True)
+class DoNotDisturb:
+    """The do-not-disturb window of a robot."""
+
+    enabled: bool
+    start_hour: int
+    start_minute: int
+    end_hour: int
+    end_minute: int
+
+    @classmethod
+    def from_config(cls, conf: dict[str, Any]) -> DoNotDisturb:
+        """Build the window from validated service or file data."""
+        return cls(conf["enabled"], conf["start"].hour, conf["start"].minute, conf["end"].hour, conf["end"].minute)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the window in the same shape the services accept."""
+        return {
+            "enabled": self.enabled,
+            "start": _hhmm(self.start_hour, self.start_minute),
+            "end": _hhmm(self.end_hour, self.end_minute),
+        }
+
+    def properties(self) -> list[dict[str, Any]]:
+        """Return the 'set_properties' payload that stores this window."""
+        values = (int(self.enabled), self.start_hour, self.start_minute, self.end_hour, self.end_minute)
+        return [{**prop, "value": value} for prop, value in zip(DND_PROPERTIES, values)]
+
+
+def _parse_rooms(fields: list[str], count: int) -> tuple[tuple[int, str], ...]:
+    """
+    Rebuild the {roomid}_{roomname} pairs from the fields after room_size.
+
+    Room names may contain underscores, so a field only starts a new room
+    while rooms are still expected and it is a number that follows a
+    named room; any other field is part of the current name.
+    """
+    rooms: list[list[Any]] = []
+    for field in fields:
+        if len(rooms) < count and field.isdigit() and (not rooms or rooms[-1][1]):
+            rooms.append([int(field), ""])
+        elif rooms:
+            rooms[-1][1] = f"{rooms[-1][1]}_{field}" if rooms[-1][1] else field
+    return tuple((room_id, name) for room_id, name in rooms)
+
+
+def parse_appointments(value: str | None) -> list[Appointment]:
+    """
+    Parse the siid 5 / piid 22 payload into Appointment objects.
+
+    Groups are separated by commas and their fields by underscores:
+    {order_id}_{order_enable}_{week}_{hour}_{minute}_{repeat}_{mode}_{suction}
+    _{water}_{twice}_{mapid}_{room_size}, followed by {roomid}_{roomname}
+    for every room. Room names may contain either separator; only the
+    twelve numeric fields must be well formed.
+    """
+    groups: list[str] = []
+    for chunk in (value or "").split(","):
+        fields = chunk.strip().split("_")
+        if groups and (len(fields) < 12 or not fields[0].strip().isdigit()):
+            # A comma inside a room name: the chunk belongs to the previous group.
+            groups[-1] += f",{chunk}"
+        elif chunk.strip():
+            groups.append(chunk.strip())
+
+    appointments = []
+    for group in groups:
+        fields = group.split("_")
+        if len(fields) < 12:
+            raise ValueError(f"Malformed appointment '{group}'")
+        numbers = [int(f) for f in fields[:12]]
+        rooms = _parse_rooms(fields[12:], numbers[11])
+        appointments.append(Appointment(
+            numbers[0], bool(numbers[1]), numbers[2], numbers[3], numbers[4], bool(numbers[5]),
+            numbers[6], numbers[7], numbers[8], bool(numbers[9]), numbers[10], rooms,
+        ))
+    return appointments
+
+
+class ScheduleManager:
+    """
+    Reads and writes the appointments and do-not-disturb window of a robot.
+
+    The robot's schedule is read once and cached for CACHE_TTL. Changes are
+    diffed against the cache by appointment id, and only the appointments
+    that were added, changed or removed are written.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator: ViomiSECoordinator) -> None:
+        """Initialize the schedule manager."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self.name = entry.title
+        self.host = entry.data[CONF_HOST]
+        self._appointments: dict[int, Appointment] | None = None
+        self._dnd: DoNotDisturb | None = None
+        self._fetched = 0.0
+        # Serializes reads and writes to this robot's schedule.
+        self._lock = asyncio.Lock()
+
+    async def _async_call(self, name: str, method: str, params: Any) -> Any:
+        """Send a command, turning device errors into a service error."""
+        try:
+            return await self._coordinator.async_run_job(name, self._coordinator.vacuum.raw_command, method, params)
+        except DeviceException as err:
+            # The cache may no longer match the robot.
+            self._fetched = 0.0
+            raise HomeAssistantError(f"{self.name}: {name} failed: {err}") from err
+
+    async def _async_set_properties(self, name: str, properties: list[dict[str, Any]]) -> None:
+        """Write properties and check every result code."""
+        result = await self._async_call(name, 'set_properties', properties)
+        if not result or any(item.get("code") != 0 for item in result):
+            self._fetched = 0.0
+            raise HomeAssistantError(f"{self.name}: The vacuum rejected {name}: {result}")
+
+    async def _async_fetch(self) -> None:
+        """Read the appointments and the do-not-disturb window from the robot."""
+        response = await self._async_call("get appointments", "action", {**ACTION_GET, "in": []})
+        out = (response or {}).get("out") or [""]
+        value = out[0].get("value") if isinstance(out[0], dict) else out[0]
+        try:
+            appointments = parse_appointments(value)
+        except ValueError as err:
+            raise HomeAssistantError(f"{self.name}: Unexpected appointment data: {err}") from err
+
+        dnd = await self._async_call("get do-not-disturb", 'get_properties', DND_PROPERTIES)
+        values = [prop.get("value") if prop.get("code") == 0 else None for prop in dnd or []]
+
+        self._appointments = {a.order_id: a for a in appointments}
+        self._dnd = (
+            DoNotDisturb(bool(values[0]), *values[1:])
+            if len(values) == len(DND_PROPERTIES) and None not in values
+            else None
+        )
+        self._fetched = time.monotonic()
+
+    async def _async_ensure_fetched(self, refresh: bool) -> None:
+        """Read the schedule unless a recent copy is cached."""
+        if refresh or self._appointments is None or time.monotonic() - self._fetched > CACHE_TTL:
+            await self._async_fetch()
+
+    async def async_get(self, refresh: bool = True) -> dict[str, Any]:
+        """Return the schedule of the robot."""
+        async with self._lock:
+            await self._async_ensure_fetched(refresh)
+            return {
+                "appointments": [a.as_dict() for a in sorted(self._appointments.values(), key=lambda a: a.order_id)],
+                "do_not_disturb": self._dnd.as_dict() if self._dnd else None,
+            }
+
+    async def async_apply(
+        self,
+        appointments: list[dict[str, Any]] | None = None,
+        do_not_disturb: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Bring the robot in line with a desired schedule.
+
+        Takes validated SCHEDULE_SCHEMA data. Returns the ids that were added,
+        changed and removed, and whether the do-not-disturb window was written.
+        """
+        async with self._lock:
+            await self._async_ensure_fetched(refresh=False)
+            current = self._appointments
+            result: dict[str, Any] = {"added": [], "changed": [], "removed": [], "do_not_disturb": False}
+
+            if appointments is not None:
+                desired = {a.order_id: a for a in map(Appointment.from_config, appointments)}
+                result["removed"] = sorted(current.keys() - desired.keys())
+                result["added"] = sorted(desired.keys() - current.keys())
+                result["changed"] = sorted(
+                    i for i in desired.keys() & current.keys() if desired[i].key != current[i].key
+                )
+                for order_id in result["removed"]:
+                    response = await self._async_call(
+                        f"delete appointment {order_id}", "action", {**ACTION_DELETE, "in": [order_id]}
+                    )
+                    if (response or {}).get("code", 0) != 0:
+                        self._fetched = 0.0
+                        raise HomeAssistantError(f"{self.name}: The vacuum did not delete appointment {order_id}")
+                    del current[order_id]
+                # Each appointment takes 13 properties, so it is written in a call of its own.
+                for order_id in result["added"] + result["changed"]:
+                    await self._async_set_properties(f"appointment {order_id}", desired[order_id].properties())
+                    current[order_id] = desired[order_id]
+
+            if do_not_disturb is not None:
+                dnd = DoNotDisturb.from_config(do_not_disturb)
+                if dnd != self._dnd:
+                    await self._async_set_properties("do-not-disturb", dnd.properties())
+                    self._dnd = dnd
+                    result["do_not_disturb"] = True
+
+            _LOGGER.debug("Viomise: Schedule of %s reconciled: %s", self.name, result)
+            return result
+
+
+async def async_reconcile_schedules(hass: HomeAssistant) -> dict[str, Any]:
+    """
+    Apply the schedule file to every robot it lists.
+
+    Robots are matched by config entry title or host and reconciled
+    concurrently, at most RECONCILE_PARALLELISM at a time. A failure on one
+    robot is reported in the result and does not stop the others.
+    """
+    path = hass.config.path(SCHEDULE_FILE)
+    try:
+        raw = await hass.async_add_executor_job(load_yaml, path)
+    except FileNotFoundError as err:
+        raise ServiceValidationError(f"Schedule file {path} not found") from err
+    try:
+        schedules = SCHEDULE_FILE_SCHEMA(raw or {})
+    except vol.Invalid as err:
+        raise ServiceValidationError(f"Invalid schedule file {path}: {err}") from err
+
+    managers: dict[str, ScheduleManager] = {}
+    for data in hass.data.get(DOMAIN, {}).values():
+        managers[data["schedule"].name] = managers[data["schedule"].host] = data["schedule"]
+    semaphore = asyncio.Semaphore(RECONCILE_PARALLELISM)
+
+    async def reconcile(robot: str, schedule: dict[str, Any] | None) -> tuple[str, dict[str, Any]]:
+        if (manager := managers.get(robot)) is None:
+            return robot, {"error": "No Viomi SE vacuum with this name or host"}
+        async with semaphore:
+            try:
+                return robot, await manager.async_apply(**(schedule or {}))
+            except HomeAssistantError as err:
+                _LOGGER.error("Viomise: Could not reconcile the schedule of %s: %s", robot, err)
+                return robot, {"error": str(err)}
+
+    return dict(await asyncio.gather(*(reconcile(robot, schedule) for robot, schedule in schedules.items())))
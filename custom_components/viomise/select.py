@@ -0,0 +1,84 @@
+# custom_components/viomise/select.py
+"""Select platform for Viomi SE settings."""
+from __future__ import annotations
+import logging
+from dataclasses import dataclass
+
+from homeassistant.components.select import SelectEntity, SelectEntityDescription
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .batcher import WriteBatcher
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+from .entity import ViomiSEEntity
+from .spec import VALUE_LISTS, encode
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(frozen=True, kw_only=True)
+class ViomiSESelectEntityDescription(SelectEntityDescription):
+    """Describes a Viomi SE select entity."""
+    # Name of the writable property in coordinator.MAPPING; its value-list gives the options.
+    prop: str
+
+SELECT_DESCRIPTIONS: tuple[ViomiSESelectEntityDescription, ...] = (
+    ViomiSESelectEntityDescription(
+        key="water_grade",
+        name="Water Grade",
+        translation_key="water_grade",
+        icon="mdi:water",
+        entity_category=EntityCategory.CONFIG,
+        prop="water_grade",
+    ),
+    ViomiSESelectEntityDescription(
+        key="mop_route",
+        name="Mop Route",
+        translation_key="mop_route",
+        icon="mdi:map-marker-path",
+        entity_category=EntityCategory.CONFIG,
+        prop="mop_route",
+    ),
+)
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    """Set up the Viomi SE select platform from a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        ViomiSESelect(data["coordinator"], entry, data["writer"], description)
+        for description in SELECT_DESCRIPTIONS
+    )
+
+class ViomiSESelect(ViomiSEEntity, SelectEntity):
+    """A setting of the vacuum with a fixed list of options."""
+    entity_description: ViomiSESelectEntityDescription
+
+    def __init__(
+        self,
+        coordinator: ViomiSECoordinator,
+        config_entry: ConfigEntry,
+        writer: WriteBatcher,
+        description: ViomiSESelectEntityDescription,
+    ):
+        """Initialize the select entity."""
+        super().__init__(coordinator, config_entry, description.key)
+        self.entity_description = description
+        self._writer = writer
+        self._attr_options = list(VALUE_LISTS[description.prop].values())
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the selected option, or None if the value is unknown."""
+        if not self.coordinator.data:
+            return None
+        return VALUE_LISTS[self.entity_description.prop].get(
+            getattr(self.coordinator.data, self.entity_description.prop)
+        )
+
+    async def async_select_option(self, option: str) -> None:
+        """Write the selected option to the vacuum."""
+        if not await self._writer.async_write(self.entity_description.prop, encode(self.entity_description.prop, option)):
+            raise HomeAssistantError(f"The vacuum did not accept {self.entity_description.key} '{option}'")
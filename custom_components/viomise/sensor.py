@@ -2,7 +2,9 @@
 """Sensor platform for Viomi SE consumables and battery."""
 from __future__ import annotations
 import logging 
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -11,24 +13,34 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, EntityCategory
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.typing import StateType
 from homeassistant.exceptions import ConfigEntryNotReady
 
+from .battery import BatteryEstimator
 from .const import DOMAIN
 from .coordinator import ViomiSECoordinator
+from .entity import ViomiSEEntity
+from .spec import options
+from .state import ViomiSEState
 
 _LOGGER = logging.getLogger(__name__)
 
 # By using a dataclass, we can extend the standard SensorEntityDescription
-# with our own custom fields, in this case, 'value_key'.
+# with our own custom fields, in this case, 'value_fn'.
 @dataclass(frozen=True, kw_only=True)
 class ViomiSESensorEntityDescription(SensorEntityDescription):
     """Describes a Viomi SE sensor entity."""
-    # This key maps the sensor to the specific value in the coordinator's data dictionary.
-    value_key: str
+    # Reads the sensor value from the coordinator's typed state snapshot.
+    value_fn: Callable[[ViomiSEState], StateType]
+
+@dataclass(frozen=True, kw_only=True)
+class ViomiSEEstimateSensorEntityDescription(SensorEntityDescription):
+    """Describes a Viomi SE sensor computed by the battery estimator."""
+    # Reads the sensor value from the battery estimator.
+    value_fn: Callable[[BatteryEstimator], StateType]
 
 # This tuple defines all the sensors that will be created by the integration.
 # This modern approach makes it very easy to add or remove sensors in the future
@@ -41,7 +53,7 @@ SENSOR_DESCRIPTIONS: tuple[ViomiSESensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_key="battary_life",
+        value_fn=lambda data: data.battary_life,
     ),
     ViomiSESensorEntityDescription(
         key="main_brush_left",
@@ -50,7 +62,7 @@ SENSOR_DESCRIPTIONS: tuple[ViomiSESensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_key="main_brush_percentage",
+        value_fn=lambda data: data.main_brush_percentage,
     ),
     ViomiSESensorEntityDescription(
         key="side_brush_left",
@@ -59,7 +71,7 @@ SENSOR_DESCRIPTIONS: tuple[ViomiSESensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_key="side_brush_percentage",
+        value_fn=lambda data: data.side_brush_percentage,
     ),
     ViomiSESensorEntityDescription(
         key="filter_left",
@@ -68,7 +80,7 @@ SENSOR_DESCRIPTIONS: tuple[ViomiSESensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_key="filter_percentage",
+        value_fn=lambda data: data.filter_percentage,
     ),
     ViomiSESensorEntityDescription(
         key="mop_left",
@@ -77,7 +89,105 @@ SENSOR_DESCRIPTIONS: tuple[ViomiSESensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_key="mop_percentage",
+        value_fn=lambda data: data.mop_percentage,
+    ),
+    # Enum sensors: the raw codes are decoded through the spec value-list index.
+    ViomiSESensorEntityDescription(
+        key="status",
+        name="Status",
+        translation_key="status",
+        icon="mdi:robot-vacuum",
+        device_class=SensorDeviceClass.ENUM,
+        options=options("run_state"),
+        value_fn=lambda data: data.status,
+    ),
+    ViomiSESensorEntityDescription(
+        key="fault",
+        name="Fault",
+        translation_key="fault",
+        icon="mdi:alert-circle-outline",
+        device_class=SensorDeviceClass.ENUM,
+        options=options("err_state"),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data.fault,
+    ),
+    ViomiSESensorEntityDescription(
+        key="box_type",
+        name="Box Type",
+        translation_key="box_type",
+        icon="mdi:delete-variant",
+        device_class=SensorDeviceClass.ENUM,
+        options=options("box_type"),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data.box,
+    ),
+    ViomiSESensorEntityDescription(
+        key="mop_attached",
+        name="Mop Attached",
+        translation_key="mop_attached",
+        icon="mdi:water-pump",
+        device_class=SensorDeviceClass.ENUM,
+        options=options("mop_type"),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data.mop,
+    ),
+    ViomiSESensorEntityDescription(
+        key="sweep_type",
+        name="Sweep Type",
+        translation_key="sweep_type",
+        icon="mdi:map-marker-path",
+        device_class=SensorDeviceClass.ENUM,
+        options=options("mode"),
+        value_fn=lambda data: data.sweep_type,
+    ),
+    ViomiSESensorEntityDescription(
+        key="water_grade",
+        name="Water Grade",
+        translation_key="water_grade",
+        icon="mdi:water",
+        device_class=SensorDeviceClass.ENUM,
+        options=options("water_grade"),
+        value_fn=lambda data: data.water,
+    ),
+)
+
+# Estimates learned from the battery level over many polls.
+ESTIMATE_DESCRIPTIONS: tuple[ViomiSEEstimateSensorEntityDescription, ...] = (
+    ViomiSEEstimateSensorEntityDescription(
+        key="cleaning_time_remaining",
+        name="Cleaning Time Remaining",
+        translation_key="cleaning_time_remaining",
+        icon="mdi:timer-sand",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=lambda estimator: estimator.cleaning_time_remaining,
+    ),
+    ViomiSEEstimateSensorEntityDescription(
+        key="area_remaining",
+        name="Area Remaining",
+        translation_key="area_remaining",
+        icon="mdi:texture-box",
+        native_unit_of_measurement="m²",
+        value_fn=lambda estimator: estimator.area_remaining,
+    ),
+    ViomiSEEstimateSensorEntityDescription(
+        key="time_to_full",
+        name="Time to Full",
+        translation_key="time_to_full",
+        icon="mdi:battery-charging",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=lambda estimator: estimator.time_to_full,
+    ),
+    ViomiSEEstimateSensorEntityDescription(
+        key="battery_health",
+        name="Battery Health",
+        translation_key="battery_health",
+        icon="mdi:battery-heart-variant",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda estimator: estimator.health,
     ),
 )
 
@@ -95,19 +205,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         _LOGGER.error("Available data: %s", hass.data.get(DOMAIN, {}).get(entry.entry_id, {}))
         raise ConfigEntryNotReady(f"Coordinator not found for {entry.entry_id}") from e
     
-    _LOGGER.debug("Coordinator found. Data keys: %s", list(coordinator.data.keys()) if coordinator.data else "None")
+    _LOGGER.debug("Coordinator found. Data version: %s", coordinator.data.version if coordinator.data else "None")
     
     # Create a list of sensor entities based on the SENSOR_DESCRIPTIONS tuple.
     entities = [
         ViomiSESensor(coordinator, entry, description)
         for description in SENSOR_DESCRIPTIONS
     ]
+    estimator = hass.data[DOMAIN][entry.entry_id]["battery"]
+    entities.extend(
+        ViomiSEEstimateSensor(coordinator, entry, estimator, description)
+        for description in ESTIMATE_DESCRIPTIONS
+    )
     _LOGGER.debug("Adding %d sensor entities", len(entities))
     async_add_entities(entities)
 
-class ViomiSESensor(CoordinatorEntity[ViomiSECoordinator], SensorEntity):
+class ViomiSESensor(ViomiSEEntity, SensorEntity):
     """Representation of a Viomi SE Sensor that fetches data from the coordinator."""
-    _attr_has_entity_name = True
     entity_description: ViomiSESensorEntityDescription
 
     def __init__(
@@ -117,30 +231,43 @@ class ViomiSESensor(CoordinatorEntity[ViomiSECoordinator], SensorEntity):
         description: ViomiSESensorEntityDescription,
     ):
         """Initialize the sensor and link it to the coordinator."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, config_entry, description.key)
         self.entity_description = description
-        
-        # Use the unique_id set in the config flow (which already includes the _viomise suffix)
-        self._attr_unique_id = f"{config_entry.unique_id}_{description.key}"
-        
-        # Use dynamic device information from miIO.info stored in the coordinator.
-        info = coordinator.device_info_data
-        
-        # Link this sensor to the same device as the vacuum entity.
-        self._attr_device_info = {
-                "identifiers": {(DOMAIN, config_entry.unique_id)},
-                "name": config_entry.title,
-                "manufacturer": "Viomi",
-                "model": info.get("model", "Viomi SE (V19)"),
-                "sw_version": info.get("fw_ver"),
-                "hw_version": info.get("hw_ver"),
-            }
 
     @property
-    def native_value(self) -> int | None:
+    def native_value(self) -> StateType:
         """Return the state of the sensor from the coordinator's data."""
         if self.coordinator.data:
-            # Use the 'value_key' from the entity description to get the correct
-            # value from the coordinator's data dictionary.
-            return self.coordinator.data.get(self.entity_description.value_key)
+            # Use the 'value_fn' from the entity description to read the correct
+            # field of the coordinator's state snapshot.
+            return self.entity_description.value_fn(self.coordinator.data)
         return None
+
+
+class ViomiSEEstimateSensor(ViomiSEEntity, SensorEntity):
+    """A battery estimate, updated together with the coordinator."""
+    entity_description: ViomiSEEstimateSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: ViomiSECoordinator,
+        config_entry: ConfigEntry,
+        estimator: BatteryEstimator,
+        description: ViomiSEEstimateSensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, description.key)
+        self.entity_description = description
+        self._estimator = estimator
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the current estimate, or None until enough has been learned."""
+        return self.entity_description.value_fn(self._estimator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the monthly history of the battery health."""
+        if self.entity_description.key != "battery_health":
+            return None
+        return {"monthly": dict(sorted(self._estimator.health_history.items()))}
@@ -0,0 +1,116 @@
+# custom_components/viomise/spec.py
+"""Value-list index for the Viomi SE MIoT specification."""
+from __future__ import annotations
+
+# Fallback option for codes that are not listed in the spec.
+UNKNOWN = "unknown"
+
+# Fault codes reported in siid 2 / piid 2 (Device Fault). The spec only
+# declares a 0-3000 value-range, so the meanings come from the vendor app.
+# Codes above 2100 are informational notices rather than real faults.
+ERROR_CODES: dict[int, str] = {
+    0: "no_error",
+    500: "radar_timeout",
+    501: "wheels_stuck",
+    502: "low_battery",
+    503: "dust_bin_missing",
+    508: "uneven_ground",
+    509: "cliff_sensor_error",
+    510: "collision_sensor_error",
+    511: "dock_unreachable",
+    512: "dock_unreachable",
+    513: "navigation_failed",
+    514: "vacuum_stuck",
+    515: "charging_error",
+    516: "mop_temperature_error",
+    521: "water_tank_missing",
+    522: "mop_missing",
+    525: "water_tank_empty",
+    527: "remove_mop",
+    528: "dust_bin_missing",
+    529: "mop_and_water_tank_missing",
+    530: "mop_and_water_tank_missing",
+    531: "water_tank_missing",
+    2101: "low_battery_resume",
+    2102: "returning_to_dock",
+    2103: "charging",
+    2104: "returning_to_dock",
+    2105: "fully_charged",
+}
+
+# This index is precompiled from the `value-list` entries of
+# specifications_viomi_v19_1.yaml (the v13 spec is identical) and is keyed by
+# the property names used in coordinator.MAPPING. Lookups are plain dict hits,
+# so decoding a value never scans the spec.
+VALUE_LISTS: dict[str, dict[int, str]] = {
+    # siid 2 / piid 1 (Status)
+    "run_state": {
+        0: "sleep",
+        1: "idle",
+        2: "paused",
+        3: "go_charging",
+        4: "charging",
+        5: "sweeping",
+        6: "sweeping_and_mopping",
+        7: "mopping",
+    },
+    # siid 2 / piid 2 (Device Fault)
+    "err_state": ERROR_CODES,
+    # siid 2 / piid 12 (Door State)
+    "box_type": {
+        0: "no_box",
+        1: "dust_box",
+        2: "water_box",
+        3: "two_in_one_box",
+    },
+    # siid 2 / piid 13 (Contact State)
+    "mop_type": {
+        0: "no_mop",
+        1: "mop_attached",
+    },
+    # siid 2 / piid 4 (Sweep Type), reported by this firmware on piid 18.
+    "mode": {
+        0: "global",
+        1: "mop",
+        2: "edge",
+        3: "area",
+        4: "point",
+        5: "control",
+    },
+    # siid 4 / piid 18 (Water output size). The legacy 'set_suction'
+    # command takes 11-13 for these levels; the property itself uses 0-2.
+    "water_grade": {
+        0: "low",
+        1: "medium",
+        2: "high",
+    },
+    # siid 4 / piid 6 (Mopping route)
+    "mop_route": {
+        0: "s_shape",
+        1: "y_shape",
+    },
+}
+
+# Reverse index (option -> code) for writing. Where several codes share an
+# option, the first one listed is used.
+CODES: dict[str, dict[str, int]] = {
+    prop: {name: code for code, name in reversed(values.items())}
+    for prop, values in VALUE_LISTS.items()
+}
+
+
+def decode(prop: str, value: int | None) -> str | None:
+    """Translate a raw property value into its value-list option."""
+    if value is None:
+        return None
+    return VALUE_LISTS[prop].get(value, UNKNOWN)
+
+
+def encode(prop: str, option: str) -> int:
+    """Translate a value-list option back into its raw property value."""
+    return CODES[prop][option]
+
+
+def options(prop: str) -> list[str]:
+    """Return the unique options of a value-list, including the fallback."""
+    return list(dict.fromkeys([*VALUE_LISTS[prop].values(), UNKNOWN]))
@@ -0,0 +1,112 @@
+# custom_components/viomise/state.py
+"""Typed state snapshot for the Viomi SE integration."""
+from __future__ import annotations
+
+from itertools import chain, islice
+import time
+from typing import Any, Iterable, NamedTuple
+
+from .spec import decode
+
+
+class ViomiSEState(NamedTuple):
+    """
+    Immutable snapshot of one poll of the vacuum.
+
+    Holds one field per polled property (same names and order as coordinator.MAPPING),
+    plus a version number that increases with every poll and the time it
+    was captured. Unreadable properties are None. Being a NamedTuple, it has
+    no per-instance dict and is built in a single pass from an iterable.
+    """
+
+    version: int
+    timestamp: float
+    run_state: int | None = None
+    mode: int | None = None
+    err_state: int | None = None
+    battary_life: int | None = None
+    box_type: int | None = None
+    mop_type: int | None = None
+    s_time: int | None = None
+    s_area: int | None = None
+    suction_grade: int | None = None
+    water_grade: int | None = None
+    remember_map: int | None = None
+    has_map: int | None = None
+    is_mop: int | None = None
+    has_newmap: int | None = None
+    main_brush_percentage: int | None = None
+    main_brush_left: int | None = None
+    side_brush_percentage: int | None = None
+    side_brush_left: int | None = None
+    filter_percentage: int | None = None
+    filter_left: int | None = None
+    mop_percentage: int | None = None
+    mop_left: int | None = None
+    repeat_state: int | None = None
+    mop_route: int | None = None
+    current_map_id: int | None = None
+    volume: int | None = None
+
+    @classmethod
+    def from_response(cls, version: int, *responses: Iterable[dict[str, Any]]) -> ViomiSEState:
+        """
+        Build a snapshot straight from one or more 'get_properties' responses.
+
+        Values are matched by position to the property fields, which follow
+        the order of coordinator.MAPPING. Any entry with a non-zero result
+        code is stored as None.
+        """
+        return cls._make(chain(
+            (version, time.time()),
+            (prop.get("value") if prop.get("code") == 0 else None for prop in chain(*responses)),
+        ))
+
+    def changed_fields(self, prev: ViomiSEState | None) -> frozenset[str]:
+        """Return the names of the properties that differ from a previous snapshot."""
+        if prev is None:
+            return frozenset(PROPERTY_FIELDS)
+        return frozenset(
+            name
+            for name, new, old in zip(PROPERTY_FIELDS, islice(self, 2, None), islice(prev, 2, None))
+            if new != old
+        )
+
+    def as_attributes(self) -> dict[str, Any]:
+        """Return the raw properties as a dictionary of state attributes."""
+        return dict(zip(PROPERTY_FIELDS, islice(self, 2, None)))
+
+    # Decoded values, resolved through the spec value-list index.
+    @property
+    def status(self) -> str | None:
+        """Return the decoded run state."""
+        return decode("run_state", self.run_state)
+
+    @property
+    def fault(self) -> str | None:
+        """Return the decoded fault code."""
+        return decode("err_state", self.err_state)
+
+    @property
+    def box(self) -> str | None:
+        """Return the decoded box type."""
+        return decode("box_type", self.box_type)
+
+    @property
+    def mop(self) -> str | None:
+        """Return whether a mop is attached, decoded."""
+        return decode("mop_type", self.mop_type)
+
+    @property
+    def sweep_type(self) -> str | None:
+        """Return the decoded sweep type."""
+        return decode("mode", self.mode)
+
+    @property
+    def water(self) -> str | None:
+        """Return the decoded water grade."""
+        return decode("water_grade", self.water_grade)
+
+
+# Names of all property fields, in declaration order.
+PROPERTY_FIELDS = ViomiSEState._fields[2:]
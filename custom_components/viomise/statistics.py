@@ -0,0 +1,208 @@
+# custom_components/viomise/statistics.py
+"""Long-term cleaning statistics for the Viomi SE integration."""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+
+try:
+    # Home Assistant 2025.4+ replaced 'has_mean' with 'mean_type'.
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Delay (s) used to batch writes of the session log to disk.
+SAVE_DELAY = 10
+# Number of log entries kept for backfilling and history.
+LOG_SIZE = 1000
+
+# 'run_state' codes during which a cleaning run is in progress (paused included).
+RUN_STATES = {2, 5, 6, 7}
+# Fault codes from 2100 up are notices (charging, returning), not errors.
+FAULT_NOTICE_MIN = 2100
+# Fault code of a run the firmware docks to recharge and then resumes by itself.
+RESUME_CODE = 2101
+# Time (s) the firmware may take to recharge and resume a run before it counts as ended.
+RESUME_TIMEOUT = 6 * 3600
+
+# Metric key -> (name suffix, unit). Every metric is pushed as an hourly sum.
+METRICS: dict[str, tuple[str, str | None]] = {
+    "area": ("cleaned area", "m²"),
+    "time": ("cleaning time", UnitOfTime.MINUTES),
+    "runs": ("cleaning runs", None),
+    "errors": ("errors", None),
+    "battery": ("battery consumed", PERCENTAGE),
+}
+
+
+def _hour_start(timestamp: float) -> datetime:
+    """Return the start of the UTC hour that contains a timestamp."""
+    return dt_util.utc_from_timestamp(timestamp).replace(minute=0, second=0, microsecond=0)
+
+
+class CleaningStatistics:
+    """
+    Aggregates cleaning runs and pushes them as external statistics.
+
+    Each finished run and each new fault adds an entry to a persisted
+    session log. The entries are summed per hour and sent to the recorder
+    with async_add_external_statistics; daily and monthly views are reduced
+    from those hourly rows by the recorder itself. Entries not yet pushed
+    (e.g. after downtime) are backfilled on startup.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator: ViomiSECoordinator) -> None:
+        """Initialize the statistics aggregator."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self._title = entry.title
+        self._object_id = slugify(entry.unique_id or entry.entry_id)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.statistics"
+        )
+        # Persisted state.
+        self.log: list[dict[str, float]] = []
+        self._run: dict[str, float] | None = None
+        self._pushed_hour: float = 0.0
+        self._base_sums: dict[str, float] = dict.fromkeys(METRICS, 0.0)
+        # Last seen fault code, to count each new fault once.
+        # A fault that is already active at startup is not counted.
+        self._last_fault: int | None = None
+
+    def statistic_id(self, metric: str) -> str:
+        """Return the external statistic id of a metric."""
+        return f"{DOMAIN}:{self._object_id}_{METRICS[metric][0].replace(' ', '_')}"
+
+    async def async_load(self) -> None:
+        """Load the session log and backfill anything not yet pushed."""
+        if (data := await self._store.async_load()) is not None:
+            self.log = data.get("log", [])
+            self._run = data.get("run")
+            self._pushed_hour = data.get("pushed_hour", 0.0)
+            self._base_sums.update(data.get("base_sums", {}))
+        self._async_push()
+
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "log": self.log[-LOG_SIZE:],
+            "run": self._run,
+            "pushed_hour": self._pushed_hour,
+            "base_sums": self._base_sums,
+        }
+
+    @callback
+    def async_handle_update(self) -> None:
+        """Track runs and faults from every coordinator update."""
+        if (data := self._coordinator.data) is None:
+            return
+        now = data.timestamp
+        entry: dict[str, float] | None = None
+
+        if data.run_state in RUN_STATES:
+            if self._run is None:
+                self._run = {"start": now, "battery": data.battary_life or 0}
+                self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+            elif self._run.get("recharging"):
+                # Resumed after recharging; count the battery from the new level.
+                self._run.update(recharging=False, battery=data.battary_life or 0)
+                self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        elif self._run is not None and data.run_state is not None:
+            run = self._run
+            if data.err_state == RESUME_CODE and not run.get("recharging"):
+                # The firmware docks to recharge and then continues the same run.
+                run.update(
+                    recharging=True,
+                    since=now,
+                    used=run.get("used", 0) + max(0, run["battery"] - (data.battary_life or 0)),
+                )
+                self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+            elif not run.get("recharging") or now - run["since"] > RESUME_TIMEOUT:
+                # The run is over: s_area and s_time report the run that just ended.
+                used = run.get("used", 0)
+                if not run.get("recharging"):
+                    used += max(0, run["battery"] - (data.battary_life or 0))
+                entry = {
+                    "ts": now,
+                    "area": data.s_area or 0,
+                    "time": data.s_time or 0,
+                    "runs": 1,
+                    "errors": 0,
+                    "battery": used,
+                }
+                self._run = None
+
+        fault = data.err_state
+        new_fault = self._last_fault is not None and fault != self._last_fault
+        if new_fault and fault and fault < FAULT_NOTICE_MIN:
+            if entry is None:
+                entry = dict.fromkeys(METRICS, 0) | {"ts": now}
+            entry["errors"] += 1
+        if fault is not None:
+            self._last_fault = fault
+
+        if entry is not None:
+            self.log.append(entry)
+            del self.log[:-LOG_SIZE]
+            self._async_push()
+
+    @callback
+    def _async_push(self) -> None:
+        """Sum pending log entries per hour and push them to the recorder."""
+        pending = [e for e in self.log if e["ts"] >= self._pushed_hour]
+        if not pending:
+            return
+
+        buckets: dict[datetime, dict[str, float]] = {}
+        for entry in pending:
+            bucket = buckets.setdefault(_hour_start(entry["ts"]), dict.fromkeys(METRICS, 0.0))
+            for metric in METRICS:
+                bucket[metric] += entry.get(metric, 0)
+
+        hours = sorted(buckets)
+        for metric, (name, unit) in METRICS.items():
+            total = self._base_sums[metric]
+            rows = []
+            for hour in hours:
+                total += buckets[hour][metric]
+                rows.append(StatisticData(start=hour, state=total, sum=total))
+            metadata = StatisticMetaData(
+                has_sum=True,
+                name=f"{self._title} {name}",
+                source=DOMAIN,
+                statistic_id=self.statistic_id(metric),
+                unit_of_measurement=unit,
+            )
+            if StatisticMeanType is not None:
+                metadata["mean_type"] = StatisticMeanType.NONE
+            else:
+                metadata["has_mean"] = False
+            async_add_external_statistics(self.hass, metadata, rows)
+
+        # The newest hour may still grow, so it is pushed again next time
+        # starting from the sums of all hours before it.
+        last = hours[-1]
+        for metric in METRICS:
+            self._base_sums[metric] += sum(buckets[hour][metric] for hour in hours[:-1])
+        self._pushed_hour = last.timestamp()
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        _LOGGER.debug("Viomise: Pushed cleaning statistics for %d hour(s)", len(hours))
+
+    async def async_shutdown(self) -> None:
+        """Write the session log to disk before unloading."""
+        await self._store.async_save(self._data_to_store())
@@ -0,0 +1,91 @@
+# custom_components/viomise/switch.py
+"""Switch platform for Viomi SE settings."""
+from __future__ import annotations
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .batcher import WriteBatcher
+from .const import DOMAIN
+from .coordinator import ViomiSECoordinator
+from .entity import ViomiSEEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(frozen=True, kw_only=True)
+class ViomiSESwitchEntityDescription(SwitchEntityDescription):
+    """Describes a Viomi SE switch entity."""
+    # Name of the writable 0/1 property in coordinator.MAPPING.
+    prop: str
+
+SWITCH_DESCRIPTIONS: tuple[ViomiSESwitchEntityDescription, ...] = (
+    ViomiSESwitchEntityDescription(
+        key="repeat_cleaning",
+        name="Repeat Cleaning",
+        translation_key="repeat_cleaning",
+        icon="mdi:repeat",
+        entity_category=EntityCategory.CONFIG,
+        prop="repeat_state",
+    ),
+    ViomiSESwitchEntityDescription(
+        key="remember_map",
+        name="Remember Map",
+        translation_key="remember_map",
+        icon="mdi:map-check",
+        entity_category=EntityCategory.CONFIG,
+        prop="remember_map",
+    ),
+)
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    """Set up the Viomi SE switch platform from a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        ViomiSESwitch(data["coordinator"], entry, data["writer"], description)
+        for description in SWITCH_DESCRIPTIONS
+    )
+
+class ViomiSESwitch(ViomiSEEntity, SwitchEntity):
+    """An on/off setting of the vacuum."""
+    entity_description: ViomiSESwitchEntityDescription
+
+    def __init__(
+        self,
+        coordinator: ViomiSECoordinator,
+        config_entry: ConfigEntry,
+        writer: WriteBatcher,
+        description: ViomiSESwitchEntityDescription,
+    ):
+        """Initialize the switch entity."""
+        super().__init__(coordinator, config_entry, description.key)
+        self.entity_description = description
+        self._writer = writer
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the setting is enabled."""
+        if not self.coordinator.data:
+            return None
+        # A property that fails to read (non-zero code) is None until the next poll.
+        value = getattr(self.coordinator.data, self.entity_description.prop)
+        return None if value is None else value == 1
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Enable the setting."""
+        await self._async_write(1)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Disable the setting."""
+        await self._async_write(0)
+
+    async def _async_write(self, value: int) -> None:
+        """Write the setting to the vacuum."""
+        if not await self._writer.async_write(self.entity_description.prop, value):
+            raise HomeAssistantError(f"The vacuum did not accept {self.entity_description.key} = {value}")
@@ -0,0 +1,115 @@
+# custom_components/viomise/tracing.py
+"""On-demand tracing of the poll and command paths for the Viomi SE integration."""
+from __future__ import annotations
+
+import cProfile
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bound on recorded spans, so a forgotten trace cannot grow unbounded.
+MAX_EVENTS = 20000
+
+
+class PerformanceTrace:
+    """
+    Records span timings for a bounded window and writes a Chrome trace.
+
+    A trace only exists while tracing is active; callers keep a reference
+    that is None otherwise, so nothing is timed when tracing is off. The
+    output opens in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, name: str, profile: bool = False) -> None:
+        """Start a new trace."""
+        self.name = name
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self._events: list[dict[str, Any]] = []
+        self._dropped = 0
+        self._profiler = cProfile.Profile() if profile else None
+        # Only one executor job is profiled at a time.
+        self._profile_lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: float, **args: Any) -> None:
+        """Record a finished span given its perf_counter start and end."""
+        if len(self._events) >= MAX_EVENTS:
+            self._dropped += 1
+            return
+        self._events.append({
+            "name": name,
+            "cat": "viomise",
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """Time the body of a with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), **args)
+
+    async def async_run_job(self, hass: HomeAssistant, name: str, func: Callable, *args: Any) -> Any:
+        """
+        Run a job in the executor, timing the queue wait and the job itself.
+
+        With profiling enabled, the job also runs under cProfile.
+        """
+        submitted = time.perf_counter()
+
+        def job() -> Any:
+            started = time.perf_counter()
+            self.add("executor queue", submitted, started, job=name)
+            profiler = self._profiler if self._profiler and self._profile_lock.acquire(blocking=False) else None
+            if profiler:
+                profiler.enable()
+            try:
+                return func(*args)
+            finally:
+                if profiler:
+                    profiler.disable()
+                    self._profile_lock.release()
+                self.add(name, started, time.perf_counter())
+
+        return await hass.async_add_executor_job(job)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Return a version of func whose calls are recorded as spans."""
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def write(self, path: str) -> dict[str, str]:
+        """Write the trace (and profile, if any) to disk. Runs in the executor."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "traceEvents": self._events,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"name": self.name, "started": self.started, "dropped_events": self._dropped},
+                },
+                file,
+            )
+        files = {"trace": path}
+        if self._profiler is not None:
+            files["profile"] = f"{os.path.splitext(path)[0]}.prof"
+            self._profiler.dump_stats(files["profile"])
+        _LOGGER.info("Viomise: Wrote %d trace events to %s", len(self._events), path)
+        return files
@@ -19,8 +19,8 @@ from homeassistant.components.vacuum import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ENTITY_ID
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError, ServiceValidationError
 from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -30,12 +30,26 @@ from .const import (
     DEFAULT_COMMAND_COOLDOWN,
     DOMAIN,
 )
+from .calibration import AffineTransform, CalibrationManager
 from .coordinator import ViomiSECoordinator
+from .planner import DEFAULT_RESUME_BATTERY, RoomJobPlanner
+from .schedule import SCHEDULE_SCHEMA, ScheduleManager
+from .walls import (
+    WALLS_PROPERTY,
+    VirtualWall,
+    VirtualWallCache,
+    diff_walls,
+    parse_walls,
+    serialize_walls,
+    validate_walls,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 # Fan speeds for the Viomi SE model.
 FAN_SPEEDS = {"Silent": 0, "Standard": 1, "Medium": 2, "Turbo": 3}
+# Reverse index so the current 'suction_grade' resolves with a single lookup.
+SUCTION_GRADE_TO_FAN_SPEED = {value: name for name, value in FAN_SPEEDS.items()}
 
 # Definition of supported features for the vacuum entity.
 SUPPORT_XIAOMI = (
@@ -68,6 +82,21 @@ SERVICE_CLEAN_SEGMENT = "vacuum_clean_segment"
 SERVICE_CLEAN_POINT = "vacuum_clean_point"
 # New service for map management
 SERVICE_SET_MAP = "vacuum_set_map"
+# Virtual walls and no-go zones
+SERVICE_GET_VIRTUAL_WALLS = "get_virtual_walls"
+SERVICE_SET_VIRTUAL_WALLS = "set_virtual_walls"
+# Coordinate calibration per map
+SERVICE_SET_CALIBRATION = "set_calibration"
+# Scheduled cleanings and do-not-disturb
+SERVICE_GET_SCHEDULE = "get_schedule"
+SERVICE_SET_SCHEDULE = "set_schedule"
+# Multi-run room jobs
+SERVICE_START_ROOM_JOB = "start_room_job"
+SERVICE_CANCEL_ROOM_JOB = "cancel_room_job"
+SERVICE_RESUME_ROOM_JOB = "resume_room_job"
+# Performance tracing
+SERVICE_START_TRACE = "start_trace"
+SERVICE_STOP_TRACE = "stop_trace"
 
 # Legacy names for backward compatibility (v1 and lovelace-xiaomi-vacuum-map-card)
 LEGACY_CLEAN_ZONE = "xiaomi_clean_zone"
@@ -82,6 +111,13 @@ ATTR_POINT = "point"
 ATTR_MAP_ID = "map_id"
 ATTR_MAP_NAME = "map_name"
 ATTR_MAP_INDEX = "map_index"
+ATTR_WALLS = "walls"
+ATTR_DOCK = "dock"
+ATTR_CALIBRATION_POINTS = "calibration_points"
+ATTR_MATRIX = "matrix"
+ATTR_DURATION = "duration"
+ATTR_PROFILE = "profile"
+ATTR_RESUME_BATTERY = "resume_battery"
 
 # Schemas for the service calls.
 SERVICE_SCHEMA_CLEAN_ZONE = {
@@ -106,6 +142,40 @@ SERVICE_SCHEMA_SET_MAP = {
     vol.Optional(ATTR_MAP_INDEX): vol.Coerce(int),
 }
 
+# Each wall is a line (2 points) or a closed no-go zone (4 points).
+SERVICE_SCHEMA_SET_VIRTUAL_WALLS = {
+    vol.Required(ATTR_WALLS): vol.All(list, [{
+        vol.Optional("id"): vol.Coerce(int),
+        vol.Required("points"): vol.All(
+            list,
+            vol.Length(min=2, max=4),
+            [vol.ExactSequence([vol.Coerce(float), vol.Coerce(float)])],
+        ),
+    }]),
+    vol.Optional(ATTR_DOCK): vol.ExactSequence([vol.Coerce(float), vol.Coerce(float)]),
+}
+
+# Same point format as the calibration_points of the xiaomi-vacuum-map-card.
+CALIBRATION_POINT = {vol.Required("x"): vol.Coerce(float), vol.Required("y"): vol.Coerce(float)}
+SERVICE_SCHEMA_SET_CALIBRATION = {
+    vol.Optional(ATTR_CALIBRATION_POINTS): vol.All(list, vol.Length(min=3), [{
+        vol.Required("map"): CALIBRATION_POINT,
+        vol.Required("vacuum"): CALIBRATION_POINT,
+    }]),
+    vol.Optional(ATTR_MATRIX): vol.ExactSequence([vol.Coerce(float)] * 6),
+    vol.Optional(ATTR_MAP_ID): vol.Coerce(int),
+}
+
+SERVICE_SCHEMA_START_ROOM_JOB = {
+    vol.Required(ATTR_SEGMENTS): vol.Any(vol.Coerce(int), vol.All([vol.Coerce(int)], vol.Length(min=1))),
+    vol.Optional(ATTR_RESUME_BATTERY, default=DEFAULT_RESUME_BATTERY): vol.All(vol.Coerce(int), vol.Range(min=30, max=100)),
+}
+
+SERVICE_SCHEMA_START_TRACE = {
+    vol.Optional(ATTR_DURATION, default=60): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+    vol.Optional(ATTR_PROFILE, default=False): cv.boolean,
+}
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the Viomi SE vacuum platform from a config entry."""
     try:
@@ -114,8 +184,14 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
         _LOGGER.error("Failed to get coordinator from hass.data: %s", e)
         raise ConfigEntryNotReady(f"Coordinator not found for {config_entry.entry_id}") from e
     
-    vacuum_entity = MiroboVacuum2(coordinator, config_entry)
+    walls = hass.data[DOMAIN][config_entry.entry_id]["walls"]
+    calibration = hass.data[DOMAIN][config_entry.entry_id]["calibration"]
+    planner = hass.data[DOMAIN][config_entry.entry_id]["planner"]
+    schedule = hass.data[DOMAIN][config_entry.entry_id]["schedule"]
+    vacuum_entity = MiroboVacuum2(coordinator, config_entry, walls, calibration, planner, schedule)
     async_add_entities([vacuum_entity])
+    # Room jobs send their batches through the entity, like a segment clean.
+    config_entry.async_on_unload(planner.async_set_dispatcher(vacuum_entity.async_clean_segment))
 
     # Register modern services under 'viomise' domain
     platform = entity_platform.async_get_current_platform()
@@ -126,6 +202,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
         SERVICE_CLEAN_SEGMENT: "async_clean_segment",
         SERVICE_CLEAN_POINT: "async_clean_point",
         SERVICE_SET_MAP: "async_set_map",
+        SERVICE_SET_CALIBRATION: "async_set_calibration",
+        SERVICE_CANCEL_ROOM_JOB: "async_cancel_room_job",
+        SERVICE_RESUME_ROOM_JOB: "async_resume_room_job",
+        SERVICE_START_TRACE: "async_start_trace",
     }
     
     # We use explicit schemas for the registration
@@ -135,6 +215,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
         SERVICE_CLEAN_SEGMENT: SERVICE_SCHEMA_CLEAN_SEGMENT,
         SERVICE_CLEAN_POINT: SERVICE_SCHEMA_CLEAN_POINT,
         SERVICE_SET_MAP: SERVICE_SCHEMA_SET_MAP,
+        SERVICE_SET_CALIBRATION: SERVICE_SCHEMA_SET_CALIBRATION,
+        SERVICE_CANCEL_ROOM_JOB: {},
+        SERVICE_RESUME_ROOM_JOB: {},
+        SERVICE_START_TRACE: SERVICE_SCHEMA_START_TRACE,
     }
 
     for service_name, method_name in modern_services.items():
@@ -144,6 +228,44 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
             method_name
         )
 
+    # These services return data, so they are registered with response support.
+    platform.async_register_entity_service(
+        SERVICE_GET_VIRTUAL_WALLS,
+        {},
+        "async_get_virtual_walls",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_SET_VIRTUAL_WALLS,
+        SERVICE_SCHEMA_SET_VIRTUAL_WALLS,
+        "async_set_virtual_walls",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    platform.async_register_entity_service(
+        SERVICE_GET_SCHEDULE,
+        {},
+        "async_get_schedule",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_SET_SCHEDULE,
+        SCHEDULE_SCHEMA,
+        "async_set_schedule",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    platform.async_register_entity_service(
+        SERVICE_START_ROOM_JOB,
+        SERVICE_SCHEMA_START_ROOM_JOB,
+        "async_start_room_job",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    platform.async_register_entity_service(
+        SERVICE_STOP_TRACE,
+        {},
+        "async_stop_trace",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     # Register Legacy Aliases under 'vacuum' domain (Backward Compatibility)
     async def handle_legacy_service(call: ServiceCall):
         """Redirect calls from vacuum domain to the viomise entity."""
@@ -173,11 +295,23 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
     """Representation of a Viomi SE Robot Vacuum."""
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator: ViomiSECoordinator, config_entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        coordinator: ViomiSECoordinator,
+        config_entry: ConfigEntry,
+        walls: VirtualWallCache,
+        calibration: CalibrationManager,
+        planner: RoomJobPlanner,
+        schedule: ScheduleManager,
+    ) -> None:
         """Initialize the vacuum entity."""
         super().__init__(coordinator)
         self._config_entry = config_entry
         self._vacuum: Device = coordinator.vacuum
+        self._walls = walls
+        self._calibration = calibration
+        self._planner = planner
+        self._schedule = schedule
         self._attr_name = config_entry.title
         self._attr_unique_id = config_entry.unique_id
         self._last_command_time: float = 0
@@ -207,27 +341,30 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
     @property
     def activity(self) -> VacuumActivity | None:
         """Return the current vacuum activity."""
-        if not self.coordinator.data or "run_state" not in self.coordinator.data:
+        if not self.coordinator.data:
             return None
-        return STATE_CODE_TO_ACTIVITY.get(self.coordinator.data["run_state"])
+        return STATE_CODE_TO_ACTIVITY.get(self.coordinator.data.run_state)
 
     @property
     def fan_speed(self) -> str | None:
         """Return the current fan speed."""
-        if not self.coordinator.data or "suction_grade" not in self.coordinator.data:
+        if not self.coordinator.data:
+            return None
+        return SUCTION_GRADE_TO_FAN_SPEED.get(self.coordinator.data.suction_grade)
+
+    @property
+    def _current_map_id(self) -> int | None:
+        """Return the id of the active map, used to pick its calibration."""
+        if not self.coordinator.data:
             return None
-        speed_value = self.coordinator.data["suction_grade"]
-        for name, value in FAN_SPEEDS.items():
-            if value == speed_value:
-                return name
-        return None
+        return self.coordinator.data.current_map_id
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the specific state attributes."""
         if not self.coordinator.data:
             return None
-        return self.coordinator.data
+        return self.coordinator.data.as_attributes()
 
     async def _try_command(self, command_name: str, mask_error: str, func: Callable, *args: Any, delay: bool = False, skip_cooldown: bool = False, **kwargs: Any) -> bool:
         """Try to call a vacuum command, handling cooldown and exceptions."""
@@ -238,7 +375,7 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
             return False
         self._last_command_time = current_time
         try:
-            await self.hass.async_add_executor_job(partial(func, *args, **kwargs))
+            await self.coordinator.async_run_job(command_name, partial(func, *args, **kwargs))
             if not delay:
                 await self.coordinator.async_request_refresh()
             else:
@@ -251,8 +388,8 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
     async def async_start(self) -> None:
         """Start or resume the cleaning task."""
         if not self.coordinator.data: return
-        mode = self.coordinator.data.get('mode')
-        is_mop = self.coordinator.data.get('is_mop')
+        mode = self.coordinator.data.mode
+        is_mop = self.coordinator.data.is_mop
         actionMode = 0
         if mode == 4 and self._last_clean_point is not None:
             method = 'set_pointclean'
@@ -271,8 +408,8 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
     async def async_pause(self) -> None:
         """Pause the cleaning task."""
         if not self.coordinator.data: return
-        mode = self.coordinator.data.get('mode')
-        is_mop = self.coordinator.data.get('is_mop')
+        mode = self.coordinator.data.mode
+        is_mop = self.coordinator.data.is_mop
         actionMode = 0
         if mode == 4 and self._last_clean_point is not None:
             method = 'set_pointclean'
@@ -291,7 +428,7 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
     async def async_stop(self, **kwargs: Any) -> None:
         """Stop the vacuum cleaner."""
         if not self.coordinator.data: return
-        mode = self.coordinator.data.get('mode')
+        mode = self.coordinator.data.mode
         if mode == 3:
             method = 'set_mode'
             param = [3, 0]
@@ -333,36 +470,31 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
     async def async_clean_zone(self, zone: list, repeats: int = 1):
         """Clean selected area(s) for the number of repeats indicated."""
 
-        result = []
-        i = 0
-        for z in zone:
-            x1, y2, x2, y1 = z
-            for _ in range(repeats):
-                res = '_'.join(str(x) for x in [i, 0, x1, y1, x1, y2, x2, y2, x2, y1])
-                result.append(res)
-                i += 1
-             
-        result = [i] + result
-        
+        # Map coordinates are converted with the calibration of the active map.
+        result = self._calibration.zone_payload(self._current_map_id, zone, repeats)
+
         if await self._try_command("clean_zone (uploadmap)", "Unable to set uploadmap for zone cleaning", self._vacuum.raw_command, 'set_uploadmap', [1], delay=True):
             if await self._try_command("clean_zone (set_zone)", "Unable to send zone cleaning command", self._vacuum.raw_command, 'set_zone', result, skip_cooldown=True):
                 await self._try_command("clean_zone (set_mode)", "Unable to start zone cleaning mode", self._vacuum.raw_command, 'set_mode', [3, 1], skip_cooldown=True)
 
     async def async_goto(self, x_coord: float, y_coord: float):
         """Go to a specific coordinate."""
+        x_coord, y_coord = self._calibration.point(self._current_map_id, x_coord, y_coord)
         self._last_clean_point = [x_coord, y_coord]
         if await self._try_command("goto (uploadmap)", "Unable to set uploadmap for goto", self._vacuum.raw_command, 'set_uploadmap', [0], delay=True):
             await self._try_command("goto (set_pointclean)", "Unable to go to point", self._vacuum.raw_command, 'set_pointclean', [1, x_coord, y_coord], skip_cooldown=True)
 
-    async def async_clean_segment(self, segments: list[int] | int):
-        """Clean selected segment(s) (rooms)."""
+    async def async_clean_segment(self, segments: list[int] | int) -> bool:
+        """Clean selected segment(s) (rooms). Returns True if the robot took the command."""
         if isinstance(segments, int):
             segments = [segments]
         if await self._try_command("clean_segment (uploadmap)", "Unable to set uploadmap for segment cleaning", self._vacuum.raw_command, 'set_uploadmap', [1], delay=True):
-            await self._try_command("clean_segment (set_mode_withroom)", "Unable to clean segments", self._vacuum.raw_command, 'set_mode_withroom', [0, 1, len(segments)] + segments, skip_cooldown=True)
+            return await self._try_command("clean_segment (set_mode_withroom)", "Unable to clean segments", self._vacuum.raw_command, 'set_mode_withroom', [0, 1, len(segments)] + segments, skip_cooldown=True)
+        return False
 
     async def async_clean_point(self, point: list[float]):
         """Clean 2m x 2m area around a specific point."""
+        point = list(self._calibration.point(self._current_map_id, point[0], point[1]))
         self._last_clean_point = point
         if await self._try_command("clean_point (uploadmap)", "Unable to set uploadmap for point cleaning", self._vacuum.raw_command, 'set_uploadmap', [0], delay=True):
             await self._try_command("clean_point (set_pointclean)", "Unable to clean point", self._vacuum.raw_command, 'set_pointclean', [1, point[0], point[1]], skip_cooldown=True)
@@ -390,8 +522,8 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
                 )
                 try:
                     # Fetch the current map list from the device
-                    response = await self.hass.async_add_executor_job(
-                        self._vacuum.raw_command, "get_map", []
+                    response = await self.coordinator.async_run_job(
+                        "get_map", self._vacuum.raw_command, "get_map", []
                     )
                     
                     # Extract and parse the nested JSON string from the response
@@ -433,3 +565,156 @@ class MiroboVacuum2(CoordinatorEntity[ViomiSECoordinator], StateVacuumEntity):
                     "Could not resolve map. Criteria: Name=%s, Index=%s, ID=%s", 
                     map_name, map_index, map_id
                 )
+
+    async def _async_read_virtual_walls(self, map_id: int | None) -> list[VirtualWall]:
+        """Read the wall set from the robot, falling back to the last one written to the map."""
+        try:
+            result = await self.coordinator.async_run_job(
+                "get_properties (virtual walls)", self._vacuum.raw_command, 'get_properties', [WALLS_PROPERTY]
+            )
+            # The property is write-only on most firmwares and then reports an error code.
+            if result and result[0].get('code') == 0 and result[0].get('value'):
+                return parse_walls(result[0]['value'])
+        except (DeviceException, ValueError) as err:
+            _LOGGER.debug("Could not read virtual walls from the device: %s", err)
+        return self._walls.walls(map_id)
+
+    async def async_get_virtual_walls(self) -> ServiceResponse:
+        """Return the virtual walls and no-go zones of the robot."""
+        map_id = self._current_map_id
+        walls = await self._async_read_virtual_walls(map_id)
+        # Report the walls in map coordinates, like the set service takes them.
+        walls = self._calibration.walls(map_id, walls, inverse=True)
+        return {"walls": [wall.as_dict() for wall in walls]}
+
+    async def async_set_virtual_walls(
+        self, walls: list[dict[str, Any]], dock: list[float] | None = None
+    ) -> ServiceResponse:
+        """
+        Replace the virtual walls and no-go zones of the robot.
+
+        The whole set is validated before anything is sent, and the write is
+        skipped when it matches the set already on the robot.
+        """
+        # Walls without an explicit id are numbered after the highest given id.
+        next_id = max((w["id"] for w in walls if "id" in w), default=0) + 1
+        desired = []
+        for wall in walls:
+            if "id" in wall:
+                wall_id = wall["id"]
+            else:
+                wall_id, next_id = next_id, next_id + 1
+            desired.append(VirtualWall(wall_id, tuple(tuple(p) for p in wall["points"])))
+
+        # Validate in robot metres, after applying the calibration of the active map.
+        map_id = self._current_map_id
+        desired = self._calibration.walls(map_id, desired)
+        # The dock sits at the robot origin; only a dock given in map
+        # coordinates goes through the calibration.
+        dock = (0.0, 0.0) if dock is None else self._calibration.point(map_id, dock[0], dock[1])
+        if errors := validate_walls(desired, dock):
+            raise ServiceValidationError(f"Invalid virtual walls: {'; '.join(errors)}")
+
+        current = await self._async_read_virtual_walls(map_id)
+        diff = diff_walls(current, desired)
+        if not diff:
+            _LOGGER.debug("Virtual walls unchanged, nothing to send")
+            return diff.as_dict()
+
+        _LOGGER.info(
+            "Updating virtual walls (added: %s, removed: %s, changed: %s)",
+            diff.added, diff.removed, diff.changed
+        )
+        # The spec stores every wall in a single property, so the full set is written.
+        try:
+            result = await self.coordinator.async_run_job(
+                "set_properties (virtual walls)",
+                self._vacuum.raw_command,
+                'set_properties',
+                [{**WALLS_PROPERTY, "value": serialize_walls(desired)}],
+            )
+        except DeviceException as err:
+            raise HomeAssistantError(f"Unable to set virtual walls: {err}") from err
+        if not result or result[0].get('code') != 0:
+            raise HomeAssistantError(f"The vacuum rejected the virtual walls: {result}")
+
+        await self._walls.async_save(map_id, desired)
+        return diff.as_dict()
+
+    async def async_set_calibration(
+        self,
+        calibration_points: list[dict[str, dict[str, float]]] | None = None,
+        matrix: list[float] | None = None,
+        map_id: int | None = None,
+    ) -> None:
+        """
+        Set the map-to-robot coordinate calibration of a map.
+
+        Accepts either reference points (map and vacuum coordinates, at least
+        three) or the six affine coefficients. Without either, the map goes
+        back to passing coordinates through unchanged.
+        """
+        if map_id is None:
+            map_id = self._current_map_id
+            if map_id is None:
+                raise ServiceValidationError(
+                    "The active map is not known yet; pass map_id to choose the map to calibrate"
+                )
+        try:
+            if calibration_points:
+                transform = AffineTransform.from_points([
+                    ((p["map"]["x"], p["map"]["y"]), (p["vacuum"]["x"], p["vacuum"]["y"]))
+                    for p in calibration_points
+                ])
+            elif matrix:
+                transform = AffineTransform(*matrix)
+            else:
+                transform = AffineTransform()
+            transform.inverse()
+        except ValueError as err:
+            raise ServiceValidationError(f"Invalid calibration: {err}") from err
+
+        _LOGGER.info("Setting calibration of map %s to %s", map_id, transform.as_list())
+        await self._calibration.async_set(map_id, transform)
+
+    async def async_get_schedule(self) -> ServiceResponse:
+        """Return the scheduled cleanings and do-not-disturb window, read from the robot."""
+        return await self._schedule.async_get()
+
+    async def async_set_schedule(
+        self,
+        appointments: list[dict[str, Any]] | None = None,
+        do_not_disturb: dict[str, Any] | None = None,
+    ) -> ServiceResponse:
+        """
+        Replace the scheduled cleanings and/or the do-not-disturb window.
+
+        Only the appointments that differ from the robot's are written.
+        """
+        return await self._schedule.async_apply(appointments, do_not_disturb)
+
+    async def async_start_room_job(self, segments: list[int] | int, resume_battery: int = DEFAULT_RESUME_BATTERY) -> ServiceResponse:
+        """
+        Clean a list of rooms over as many runs as the battery needs.
+
+        Returns the planned batches.
+        """
+        if isinstance(segments, int):
+            segments = [segments]
+        return await self._planner.async_start(segments, resume_battery)
+
+    async def async_cancel_room_job(self) -> None:
+        """Cancel the current room job."""
+        await self._planner.async_cancel()
+
+    async def async_resume_room_job(self) -> None:
+        """Continue a room job that was paused by stopping its batch."""
+        await self._planner.async_resume()
+
+    async def async_start_trace(self, duration: float, profile: bool = False) -> None:
+        """Start tracing the poll and command paths of this vacuum."""
+        self.coordinator.async_start_trace(duration, profile)
+
+    async def async_stop_trace(self) -> ServiceResponse:
+        """Stop tracing and return the paths of the written files."""
+        return await self.coordinator.async_stop_trace()
@@ -0,0 +1,254 @@
+# custom_components/viomise/walls.py
+"""Virtual wall and no-go zone helpers for the Viomi SE integration."""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+import logging
+from typing import Any, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wall types as defined by siid 6 / piid 3 of the spec.
+WALL_TYPE_LINE = 2
+WALL_TYPE_QUAD = 3
+POINTS_PER_TYPE = {WALL_TYPE_LINE: 2, WALL_TYPE_QUAD: 4}
+
+# Device coordinates are in metres around the map origin, where the robot
+# starts its map on the dock. Anything further out is almost certainly a
+# pixel coordinate passed by mistake.
+WALL_COORD_LIMIT = 50.0
+# Minimum distance (m) between any wall and the dock, so the robot can still
+# reach its charger.
+DOCK_CLEARANCE = 0.5
+
+# MIoT property that holds the wall set (siid 6 / piid 3).
+WALLS_PROPERTY = {"did": "virtual_walls", "siid": 6, "piid": 3}
+
+STORAGE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class VirtualWall:
+    """A single virtual wall (line) or no-go zone (quadrilateral)."""
+
+    wall_id: int
+    points: tuple[tuple[float, float], ...]
+
+    @property
+    def wall_type(self) -> int:
+        """Return the spec type code for this wall."""
+        return WALL_TYPE_LINE if len(self.points) == 2 else WALL_TYPE_QUAD
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the wall in the same shape the services accept."""
+        return {"id": self.wall_id, "points": [list(p) for p in self.points]}
+
+
+@dataclass
+class WallDiff:
+    """Difference between the walls on the robot and the requested set."""
+
+    added: list[int] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+    changed: list[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Return True when anything needs to be sent to the robot."""
+        return bool(self.added or self.removed or self.changed)
+
+    def as_dict(self) -> dict[str, list[int]]:
+        """Return the diff as service response data."""
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+def _fmt(value: float) -> str:
+    """Format a coordinate the way the vendor app does (max two decimals)."""
+    # Adding 0.0 turns -0.0 into 0.0 so it is not sent as '-0'.
+    return f"{round(value, 2) + 0.0:g}"
+
+
+def parse_walls(value: str | list | None) -> list[VirtualWall]:
+    """
+    Parse the siid 6 / piid 3 payload into VirtualWall objects.
+
+    Format: [n,'id_type_x1_y1_x2_y2',...] with type 2 for a line and
+    type 3 for a closed quadrilateral.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        body = value.strip().lstrip("[").rstrip("]")
+        parts = [p.strip().strip("'\"") for p in body.split(",") if p.strip()]
+    else:
+        parts = [str(p) for p in value]
+    if not parts:
+        return []
+
+    count, entries = int(parts[0]), parts[1:]
+    if count != len(entries):
+        raise ValueError(f"Wall count {count} does not match {len(entries)} entries")
+
+    walls = []
+    for entry in entries:
+        wall_id, wall_type, *coords = entry.split("_")
+        wall_type = int(wall_type)
+        if wall_type not in POINTS_PER_TYPE or len(coords) != POINTS_PER_TYPE[wall_type] * 2:
+            raise ValueError(f"Malformed wall entry '{entry}'")
+        values = [float(c) for c in coords]
+        walls.append(VirtualWall(int(wall_id), tuple(zip(values[0::2], values[1::2]))))
+    return walls
+
+
+def serialize_walls(walls: Iterable[VirtualWall]) -> str:
+    """Serialize walls into the siid 6 / piid 3 payload."""
+    entries = [
+        "'" + "_".join([str(w.wall_id), str(w.wall_type), *(_fmt(c) for p in w.points for c in p)]) + "'"
+        for w in walls
+    ]
+    return "[" + ",".join([str(len(entries)), *entries]) + "]"
+
+
+def _segments_cross(a: tuple, b: tuple, c: tuple, d: tuple) -> bool:
+    """Return True if segment a-b properly crosses segment c-d."""
+    def orient(p, q, r):
+        return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+
+    d1, d2 = orient(c, d, a), orient(c, d, b)
+    d3, d4 = orient(a, b, c), orient(a, b, d)
+    return ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)) and 0 not in (d1, d2, d3, d4)
+
+
+def _point_segment_distance(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    """Return the distance from point p to segment a-b."""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    cx, cy = ax + t * dx - px, ay + t * dy - py
+    return (cx * cx + cy * cy) ** 0.5
+
+
+def _contains(points: tuple, px: float, py: float) -> bool:
+    """Return True if (px, py) lies inside the polygon (ray casting)."""
+    inside = False
+    for (ax, ay), (bx, by) in zip(points, points[1:] + points[:1]):
+        if (ay > py) != (by > py) and px < ax + (py - ay) * (bx - ax) / (by - ay):
+            inside = not inside
+    return inside
+
+
+def validate_walls(
+    walls: list[VirtualWall],
+    dock: tuple[float, float] = (0.0, 0.0),
+    limit: float = WALL_COORD_LIMIT,
+    clearance: float = DOCK_CLEARANCE,
+) -> list[str]:
+    """
+    Validate the geometry of a whole wall set in one pass.
+
+    All points and edges are flattened once, so bounds and dock checks run
+    over the full set instead of wall by wall. Returns a list of problems,
+    which is empty when the set can be sent to the robot.
+    """
+    errors: list[str] = []
+
+    counts = Counter(w.wall_id for w in walls)
+    errors.extend(f"Wall {i}: duplicate id" for i, n in sorted(counts.items()) if n > 1)
+    errors.extend(
+        f"Wall {w.wall_id}: expected 2 (line) or 4 (zone) points, got {len(w.points)}"
+        for w in walls
+        if len(w.points) not in (2, 4)
+    )
+    if errors:
+        return errors
+
+    # Flatten every edge of every wall: (wall_id, ax, ay, bx, by).
+    edges = [
+        (w.wall_id, *a, *b)
+        for w in walls
+        for a, b in (
+            [w.points] if w.wall_type == WALL_TYPE_LINE else zip(w.points, w.points[1:] + w.points[:1])
+        )
+    ]
+
+    out_of_bounds = {e[0] for e in edges if max(abs(e[1]), abs(e[2]), abs(e[3]), abs(e[4])) > limit}
+    degenerate = {e[0] for e in edges if e[1] == e[3] and e[2] == e[4]}
+    near_dock = {e[0] for e in edges if _point_segment_distance(*dock, *e[1:]) < clearance}
+    near_dock.update(w.wall_id for w in walls if w.wall_type == WALL_TYPE_QUAD and _contains(w.points, *dock))
+    # A quadrilateral self-intersects when either pair of opposite edges crosses.
+    crossing = {
+        w.wall_id
+        for w in walls
+        if w.wall_type == WALL_TYPE_QUAD
+        and (
+            _segments_cross(w.points[0], w.points[1], w.points[2], w.points[3])
+            or _segments_cross(w.points[1], w.points[2], w.points[3], w.points[0])
+        )
+    }
+
+    errors.extend(f"Wall {i}: coordinates outside ±{limit} m" for i in sorted(out_of_bounds))
+    errors.extend(f"Wall {i}: has zero-length edges" for i in sorted(degenerate))
+    errors.extend(f"Wall {i}: closer than {clearance} m to the dock" for i in sorted(near_dock))
+    errors.extend(f"Wall {i}: zone edges intersect each other" for i in sorted(crossing))
+    return errors
+
+
+def diff_walls(current: list[VirtualWall], desired: list[VirtualWall]) -> WallDiff:
+    """Compare two wall sets by id, ignoring sub-centimetre noise."""
+    def key(wall: VirtualWall) -> tuple:
+        return tuple(_fmt(c) for p in wall.points for c in p)
+
+    before = {w.wall_id: key(w) for w in current}
+    after = {w.wall_id: key(w) for w in desired}
+    return WallDiff(
+        added=sorted(after.keys() - before.keys()),
+        removed=sorted(before.keys() - after.keys()),
+        changed=sorted(i for i in after.keys() & before.keys() if after[i] != before[i]),
+    )
+
+
+class VirtualWallCache:
+    """
+    Keeps the last known wall set of each map of a robot.
+
+    The spec declares siid 6 / piid 3 as write-only, so most firmwares will
+    not report the walls back. The last set written through the integration
+    is persisted per map and used whenever the robot does not return its own.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.virtual_walls"
+        )
+        self._walls: dict[int, list[VirtualWall]] = {}
+
+    async def async_load(self) -> None:
+        """Load the persisted wall sets."""
+        if (data := await self._store.async_load()) is None:
+            return
+        for map_id, payload in data.get("maps", {}).items():
+            try:
+                self._walls[int(map_id)] = parse_walls(payload)
+            except ValueError as err:
+                _LOGGER.warning("Viomise: Ignoring stored virtual walls of map '%s': %s", map_id, err)
+
+    def walls(self, map_id: int | None) -> list[VirtualWall]:
+        """Return the last wall set written to a map."""
+        return self._walls.get(map_id, [])
+
+    async def async_save(self, map_id: int | None, walls: list[VirtualWall]) -> None:
+        """Remember and persist the wall set that is now on a map."""
+        # Without a map id there is nothing to key the set on.
+        if map_id is None:
+            return
+        self._walls[map_id] = walls
+        await self._store.async_save(
+            {"maps": {str(i): serialize_walls(w) for i, w in self._walls.items()}}
+        )